@@ -10,6 +10,7 @@ from sqlalchemy import (
     Enum,
     CheckConstraint,
     Index,
+    func,
 )
 from sqlalchemy.dialects.postgresql import JSON
 from sqlalchemy.orm import (
@@ -966,7 +967,7 @@ class OAuthConsentLog(Base):
     email: Mapped[str] = mapped_column(String(320), nullable=False)
     consent_given: Mapped[bool] = mapped_column(Boolean, nullable=False)
     consent_timestamp: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), nullable=False
+        DateTime(timezone=True), nullable=False, server_default=func.now()
     )
     client_ip: Mapped[Optional[str]] = mapped_column(
         String(45), nullable=True
@@ -981,8 +982,25 @@ class OAuthConsentLog(Base):
 
     # Table-level indexes for performance
     __table_args__ = (
-        Index("idx_oauth_consent_user_provider", "user_id", "provider"),
-        Index("idx_oauth_consent_email", "email"),
+        # Serves "latest decision per user/provider" lookups and the
+        # retention cleanup's per-user/provider ranking; INCLUDE makes the
+        # consent reads index-only scans on PostgreSQL
+        Index(
+            "idx_oauth_consent_user_provider_timestamp",
+            "user_id",
+            "provider",
+            "consent_timestamp",
+            postgresql_include=["consent_given", "revoked_at"],
+        ),
+        # Serves "latest decision for email/provider" lookups; the email
+        # prefix also covers plain email filters
+        Index(
+            "idx_oauth_consent_email_provider_timestamp",
+            "email",
+            "provider",
+            "consent_timestamp",
+            postgresql_include=["consent_given", "revoked_at"],
+        ),
         Index("idx_oauth_consent_timestamp", "consent_timestamp"),
         Index("idx_oauth_consent_provider", "provider"),
     )
@@ -8,6 +8,7 @@ and production environments.
 import os
 import asyncio
 import html
+import threading
 from typing import Optional, List
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
@@ -18,6 +19,29 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Synchronous sends are scheduled onto one long-lived background event loop
+# instead of building and tearing down a loop (and thread pool) per call
+_loop_lock = threading.Lock()
+_background_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    """Return the shared background event loop, starting it on first use."""
+    global _background_loop
+    with _loop_lock:
+        if _background_loop is None or _background_loop.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, name="email-sync-loop", daemon=True
+            ).start()
+            _background_loop = loop
+    return _background_loop
+
+
+def _run_sync(coro):
+    """Run a coroutine on the background loop and wait for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_background_loop()).result()
+
 
 class EmailService:
     """Email service for sending emails via SMTP."""
@@ -126,51 +150,9 @@ class EmailService:
         Returns:
             bool: True if email was sent successfully, False otherwise
         """
-        try:
-            # Try to get the current event loop
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # If loop is already running, create a new thread
-                import concurrent.futures
-
-                def run_in_thread():
-                    new_loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(new_loop)
-                    try:
-                        return new_loop.run_until_complete(
-                            self.send_email(
-                                to_email,
-                                subject,
-                                html_content,
-                                text_content,
-                                attachments,
-                            )
-                        )
-                    finally:
-                        new_loop.close()
-
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(run_in_thread)
-                    return future.result()
-            else:
-                # Loop exists but not running, use it
-                return loop.run_until_complete(
-                    self.send_email(
-                        to_email, subject, html_content, text_content, attachments
-                    )
-                )
-        except RuntimeError:
-            # No event loop exists, create a new one
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                return loop.run_until_complete(
-                    self.send_email(
-                        to_email, subject, html_content, text_content, attachments
-                    )
-                )
-            finally:
-                loop.close()
+        return _run_sync(
+            self.send_email(to_email, subject, html_content, text_content, attachments)
+        )
 
 
 # Global email service instance
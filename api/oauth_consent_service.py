@@ -11,14 +11,107 @@ This service provides:
 - Security-first approach with comprehensive logging
 """
 
+import json
+import re
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timezone, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc
+from sqlalchemy import (
+    String,
+    and_,
+    bindparam,
+    cast,
+    delete,
+    desc,
+    func,
+    insert,
+    literal_column,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import JSON, JSONB, array
 
 from .database import User, OAuthConsentLog
 from .oauth_base import OAuthSecurityContext
 
+# Session.info key for get_all_active_consents results memoized per user id;
+# sessions are created per request, so the memo lives for one request
+_CONSENT_CACHE_KEY = "oauth_consent_cache"
+
+
+# Provider names become JSON object keys inside SQL path expressions, which
+# have no escaping, so they are limited to characters that need none
+_PROVIDER_KEY_PATTERN = re.compile(r"[A-Za-z0-9_-]+")
+
+
+def _validate_provider_key(provider: str) -> None:
+    """Reject provider names that can't be used as a JSON path key."""
+    if not _PROVIDER_KEY_PATTERN.fullmatch(provider):
+        raise ValueError(f"Invalid OAuth provider name: {provider!r}")
+
+
+def _json_object(column, dialect_name: str):
+    """
+    Build an expression for column as a JSON object, treating both SQL NULL
+    and a stored JSON null (how the JSON type saves None) as {}.
+    """
+    if dialect_name == "postgresql":
+        return func.coalesce(
+            func.nullif(cast(column, JSONB), literal_column("'null'::jsonb")),
+            literal_column("'{}'::jsonb"),
+        )
+    if dialect_name == "sqlite":
+        return func.coalesce(
+            func.nullif(column, literal_column("'null'")), literal_column("'{}'")
+        )
+    raise NotImplementedError(
+        f"Server-side consent updates are not supported on {dialect_name}"
+    )
+
+
+def _sqlite_key_path():
+    """Build SQLite's JSON path for the :provider key."""
+    return func.printf('$."%s"', bindparam("provider", type_=String))
+
+
+def _json_set_key(
+    column, value_param: str, dialect_name: str, create_missing: bool = True
+):
+    """
+    Build a server-side expression that sets column[:provider] to :value_param.
+
+    The bound value must already be JSON-encoded text, and :provider must have
+    passed _validate_provider_key. PostgreSQL goes through jsonb_set (the
+    column itself is json) and SQLite through json_set. With create_missing
+    False an absent key is left absent (json_replace on SQLite).
+    """
+    value = bindparam(value_param, type_=String)
+    target = _json_object(column, dialect_name)
+    if dialect_name == "postgresql":
+        return cast(
+            func.jsonb_set(
+                target,
+                array([bindparam("provider", type_=String)]),
+                cast(value, JSONB),
+                create_missing,
+            ),
+            JSON,
+        )
+    set_function = func.json_set if create_missing else func.json_replace
+    return set_function(target, _sqlite_key_path(), func.json(value))
+
+
+def _json_remove_key(column, dialect_name: str):
+    """
+    Build a server-side expression that removes the :provider key from column.
+
+    :provider must have passed _validate_provider_key.
+    """
+    target = _json_object(column, dialect_name)
+    if dialect_name == "postgresql":
+        return cast(target.op("-")(bindparam("provider", type_=String)), JSON)
+    return func.json_remove(target, _sqlite_key_path())
+
 
 class ConsentRequiredResponse:
     """Response when OAuth consent is required for account linking."""
@@ -64,43 +157,113 @@ class OAuthConsentService:
             user_agent: Client user agent for audit trail
             security_ctx: Optional security context for enhanced logging
         """
-        # Create consent log entry
-        consent_log = OAuthConsentLog(
-            user_id=user.id,
-            provider=provider,
-            provider_user_id=provider_user_id,
-            email=user.email,
-            consent_given=consent_given,
-            consent_timestamp=datetime.now(timezone.utc),
-            client_ip=client_ip,
-            user_agent=user_agent,
+        OAuthConsentService.record_consent_decisions(
+            db,
+            [
+                {
+                    "user": user,
+                    "provider": provider,
+                    "provider_user_id": provider_user_id,
+                    "consent_given": consent_given,
+                    "client_ip": client_ip,
+                    "user_agent": user_agent,
+                    "security_ctx": security_ctx,
+                }
+            ],
         )
 
-        db.add(consent_log)
-
-        # Update user's consent tracking fields
-        # Create new dict objects to trigger SQLAlchemy change detection
-        consent_dict = (
-            user.oauth_consent_given.copy() if user.oauth_consent_given else {}
-        )
-        timestamp_dict = (
-            user.oauth_consent_timestamps.copy()
-            if user.oauth_consent_timestamps
-            else {}
-        )
+    @staticmethod
+    def record_consent_decisions(db: Session, decisions: List[Dict[str, Any]]) -> None:
+        """
+        Record several consent decisions in one transaction.
 
-        consent_dict[provider] = consent_given
-        timestamp_dict[provider] = datetime.now(timezone.utc).isoformat()
+        Audit log rows are written with a single bulk insert and the affected
+        users' consent tracking fields are patched server-side in one batched
+        UPDATE, so the number of statements does not grow with the number of
+        decisions and concurrent decisions for other providers aren't lost.
 
-        user.oauth_consent_given = consent_dict
-        user.oauth_consent_timestamps = timestamp_dict
+        Args:
+            db: Database session
+            decisions: Dicts with the keyword arguments of
+                record_consent_decision (user, provider, provider_user_id,
+                consent_given, client_ip, user_agent, optional security_ctx)
+        """
+        # An empty parameter list would make the bulk INSERT write one
+        # all-defaults row, so there is nothing to execute for an empty batch
+        if not decisions:
+            return
+
+        now = datetime.now(timezone.utc)
+        timestamp = json.dumps(now.isoformat())
+
+        consent_log_rows = []
+        consent_updates = []
+        for decision in decisions:
+            user = decision["user"]
+            provider = decision["provider"]
+            consent_given = decision["consent_given"]
+            _validate_provider_key(provider)
+
+            consent_log_rows.append(
+                {
+                    "user_id": user.id,
+                    "provider": provider,
+                    "provider_user_id": decision["provider_user_id"],
+                    "email": user.email,
+                    "consent_given": consent_given,
+                    "consent_timestamp": now,
+                    "client_ip": decision["client_ip"],
+                    "user_agent": decision["user_agent"],
+                }
+            )
+            consent_updates.append(
+                {
+                    "user_id": user.id,
+                    "provider": provider,
+                    "consent_value": json.dumps(consent_given),
+                    "timestamp_value": timestamp,
+                }
+            )
+            OAuthConsentService.invalidate_consent_cache(db, user)
+
+        # Update user's consent tracking fields one key at a time on the
+        # server, so concurrent decisions for other providers aren't lost
+        dialect_name = db.get_bind().dialect.name
+        users_table = User.__table__
+        set_user_consent = (
+            update(users_table)
+            .where(users_table.c.id == bindparam("user_id"))
+            .values(
+                oauth_consent_given=_json_set_key(
+                    users_table.c.oauth_consent_given, "consent_value", dialect_name
+                ),
+                oauth_consent_timestamps=_json_set_key(
+                    users_table.c.oauth_consent_timestamps,
+                    "timestamp_value",
+                    dialect_name,
+                ),
+            )
+        )
 
+        db.execute(insert(OAuthConsentLog), consent_log_rows)
+        db.execute(set_user_consent, consent_updates)
         db.commit()
 
+        # Reload the tracking fields from the database on next access
+        for decision in decisions:
+            user = decision["user"]
+            db.expire(user, ["oauth_consent_given", "oauth_consent_timestamps"])
+
         # Enhanced security logging
-        if security_ctx:
-            action = "CONSENT_GRANTED" if consent_given else "CONSENT_DENIED"
-            security_ctx.log_event(f"{action} for {provider} account linking")
+        for decision in decisions:
+            security_ctx = decision.get("security_ctx")
+            if security_ctx:
+                action = (
+                    "CONSENT_GRANTED" if decision["consent_given"] else "CONSENT_DENIED"
+                )
+                security_ctx.log_event(
+                    f"{action} for {decision['provider']} account linking"
+                )
 
     @staticmethod
     def check_existing_consent(
@@ -117,10 +280,11 @@ class OAuthConsentService:
         Returns:
             Optional[bool]: True if consented, False if denied, None if no decision
         """
-        # Get most recent consent decision for this email/provider combo
-        latest_consent = (
-            db.query(OAuthConsentLog)
-            .filter(
+        # Get most recent consent decision for this email/provider combo,
+        # selecting only the flag instead of hydrating a full log object
+        return db.execute(
+            select(OAuthConsentLog.consent_given)
+            .where(
                 and_(
                     OAuthConsentLog.email == email,
                     OAuthConsentLog.provider == provider,
@@ -128,13 +292,8 @@ class OAuthConsentService:
                 )
             )
             .order_by(desc(OAuthConsentLog.consent_timestamp))
-            .first()
-        )
-
-        if latest_consent:
-            return latest_consent.consent_given
-
-        return None
+            .limit(1)
+        ).scalar()
 
     @staticmethod
     def revoke_oauth_consent(db: Session, user: User, provider: str) -> bool:
@@ -149,10 +308,14 @@ class OAuthConsentService:
         Returns:
             bool: True if consent was revoked, False if no consent found
         """
-        # Find active consent logs for this user/provider
-        active_consents = (
-            db.query(OAuthConsentLog)
-            .filter(
+        _validate_provider_key(provider)
+
+        # Mark all active consent logs for this user/provider as revoked in
+        # one statement instead of loading them first
+        revocation_time = datetime.now(timezone.utc)
+        result = db.execute(
+            update(OAuthConsentLog)
+            .where(
                 and_(
                     OAuthConsentLog.user_id == user.id,
                     OAuthConsentLog.provider == provider,
@@ -160,31 +323,45 @@ class OAuthConsentService:
                     OAuthConsentLog.revoked_at.is_(None),
                 )
             )
-            .all()
+            .values(revoked_at=revocation_time)
         )
 
-        if not active_consents:
+        if result.rowcount == 0:
             return False
 
-        # Mark all active consents as revoked
-        revocation_time = datetime.now(timezone.utc)
-        for consent in active_consents:
-            consent.revoked_at = revocation_time
-
-        # Update user's consent tracking
-        # Create new dict objects to trigger SQLAlchemy change detection
-        if user.oauth_consent_given and provider in user.oauth_consent_given:
-            consent_dict = user.oauth_consent_given.copy()
-            del consent_dict[provider]  # Remove consent entirely upon revocation
-            user.oauth_consent_given = consent_dict
+        # Update user's consent tracking on the server, one key at a time, so
+        # concurrent decisions for other providers aren't lost: the consent
+        # is removed entirely and an existing timestamp records the revocation
+        dialect_name = db.get_bind().dialect.name
+        users_table = User.__table__
+        db.execute(
+            update(users_table)
+            .where(users_table.c.id == bindparam("user_id"))
+            .values(
+                oauth_consent_given=_json_remove_key(
+                    users_table.c.oauth_consent_given, dialect_name
+                ),
+                oauth_consent_timestamps=_json_set_key(
+                    users_table.c.oauth_consent_timestamps,
+                    "timestamp_value",
+                    dialect_name,
+                    create_missing=False,
+                ),
+            ),
+            {
+                "user_id": user.id,
+                "provider": provider,
+                "timestamp_value": json.dumps(revocation_time.isoformat()),
+            },
+        )
 
-        if user.oauth_consent_timestamps and provider in user.oauth_consent_timestamps:
-            timestamp_dict = user.oauth_consent_timestamps.copy()
-            timestamp_dict[provider] = revocation_time.isoformat()
-            user.oauth_consent_timestamps = timestamp_dict
+        OAuthConsentService.invalidate_consent_cache(db, user)
 
         db.commit()
 
+        # Reload the tracking fields from the database on next access
+        db.expire(user, ["oauth_consent_given", "oauth_consent_timestamps"])
+
         return True
 
     @staticmethod
@@ -246,18 +423,85 @@ class OAuthConsentService:
         if user.oauth_consent_given and provider in user.oauth_consent_given:
             return user.oauth_consent_given[provider]
 
-        # Fallback to database check
-        result = OAuthConsentService.check_existing_consent(db, user.email, provider)
-        return result is True
+        # Fallback to database check; one query covers every provider and is
+        # memoized for the rest of the session (request) so repeated and
+        # per-provider checks don't hit the database again
+        cache = db.info.setdefault(_CONSENT_CACHE_KEY, {})
+        consents = cache.get(user.id)
+        if consents is None:
+            consents = OAuthConsentService.get_all_active_consents(db, user)
+            cache[user.id] = consents
+        return consents.get(provider) is True
 
     @staticmethod
-    def cleanup_expired_consent_logs(db: Session, days_to_keep: int = 365) -> int:
+    def get_all_active_consents(db: Session, user: User) -> Dict[str, bool]:
+        """
+        Get the latest non-revoked consent decision for every provider.
+
+        Decisions are matched by the user's email, like check_existing_consent,
+        so logs recorded under that email before the current user row existed
+        still count.
+
+        Args:
+            db: Database session
+            user: User to check
+
+        Returns:
+            Dict[str, bool]: Latest consent decision keyed by provider name
+        """
+        ranked = (
+            select(
+                OAuthConsentLog.provider,
+                OAuthConsentLog.consent_given,
+                func.row_number()
+                .over(
+                    partition_by=OAuthConsentLog.provider,
+                    order_by=desc(OAuthConsentLog.consent_timestamp),
+                )
+                .label("rank"),
+            )
+            .where(
+                and_(
+                    OAuthConsentLog.email == user.email,
+                    OAuthConsentLog.revoked_at.is_(None),
+                )
+            )
+            .subquery()
+        )
+
+        rows = db.execute(
+            select(ranked.c.provider, ranked.c.consent_given).where(ranked.c.rank == 1)
+        )
+        return {provider: consent_given for provider, consent_given in rows}
+
+    @staticmethod
+    def invalidate_consent_cache(db: Session, user: User) -> None:
+        """
+        Drop the user's memoized provider consents from the session.
+
+        Called whenever the user's consent decisions change; callers that
+        modify consent logs directly must call it too.
+
+        Args:
+            db: Database session holding the memo
+            user: User whose consents changed
+        """
+        db.info.get(_CONSENT_CACHE_KEY, {}).pop(user.id, None)
+
+    @staticmethod
+    def cleanup_expired_consent_logs(
+        db: Session, days_to_keep: int = 365, batch_size: int = 10000
+    ) -> int:
         """
         Clean up old consent logs for data retention compliance.
 
+        Logs are deleted in batches, each committed separately, so a large
+        backlog doesn't hold one long-running lock on the table.
+
         Args:
             db: Database session
             days_to_keep: Number of days to retain logs
+            batch_size: Maximum number of logs deleted per statement
 
         Returns:
             int: Number of logs cleaned up
@@ -267,38 +511,33 @@ class OAuthConsentService:
         # Only delete logs older than cutoff, but keep the most recent decision
         # per user/provider
         # This ensures we always have the latest consent status
-        old_logs = (
-            db.query(OAuthConsentLog)
-            .filter(OAuthConsentLog.consent_timestamp < cutoff_date)
-            .all()
-        )
-
-        # Filter to only delete logs that aren't the most recent for their
-        # user/provider combo
-        logs_to_delete = []
-        for log in old_logs:
-            latest_for_combo = (
-                db.query(OAuthConsentLog)
-                .filter(
-                    and_(
-                        OAuthConsentLog.user_id == log.user_id,
-                        OAuthConsentLog.provider == log.provider,
-                    )
-                )
-                .order_by(desc(OAuthConsentLog.consent_timestamp))
-                .first()
+        ranked = select(
+            OAuthConsentLog.id,
+            OAuthConsentLog.consent_timestamp,
+            func.row_number()
+            .over(
+                partition_by=(OAuthConsentLog.user_id, OAuthConsentLog.provider),
+                order_by=desc(OAuthConsentLog.consent_timestamp),
             )
+            .label("rank"),
+        ).subquery()
+        expired_batch = (
+            select(ranked.c.id)
+            .where(and_(ranked.c.rank > 1, ranked.c.consent_timestamp < cutoff_date))
+            .limit(batch_size)
+        )
+        delete_batch = (
+            delete(OAuthConsentLog)
+            .where(OAuthConsentLog.id.in_(expired_batch))
+            .execution_options(synchronize_session="fetch")
+        )
 
-            # Only delete if this isn't the latest log for this user/provider combo
-            if latest_for_combo and latest_for_combo.id != log.id:
-                logs_to_delete.append(log)
-
-        # Delete the filtered logs
-        count = len(logs_to_delete)
-        for log in logs_to_delete:
-            db.delete(log)
-
-        if count > 0:
-            db.commit()
-
-        return count
+        count = 0
+        while True:
+            deleted = db.execute(delete_batch).rowcount
+            if deleted > 0:
+                db.commit()
+                count += deleted
+            # A short batch means nothing expired is left
+            if deleted < batch_size:
+                return count
@@ -12,12 +12,20 @@ Security Features:
 - Email scope validation
 """
 
+import base64
+import functools
+import hashlib
+import hmac
 import os
+import threading
+import time
 import uuid
 import jwt
+import orjson
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Optional, Tuple
 
 
 class OperationTokenError(Exception):
@@ -56,6 +64,17 @@ class TokenUserMismatchError(OperationTokenError):
     pass
 
 
+@functools.lru_cache(maxsize=4096)
+def _normalize_email(email: str) -> str:
+    """Normalize email case and whitespace, cached for repeat token issues."""
+    return email.strip().lower()
+
+
+def _b64url_encode(data: bytes) -> str:
+    """Base64url-encode bytes without padding, as required by the JWS spec."""
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
 class OperationTokenManager:
     """
     Manages secure, short-lived tokens for multi-step security operations.
@@ -73,6 +92,19 @@ class OperationTokenManager:
         self.algorithm = "HS256"
         self.expiry_minutes = 10  # Short-lived tokens for security
 
+        # Every operation token shares the same header, so encode it once
+        self._header_b64 = _b64url_encode(
+            orjson.dumps({"alg": self.algorithm, "typ": "JWT"})
+        )
+
+        # LRU of tokens issued by this manager, keyed to (signing key,
+        # payload), so a same-process generate -> verify round trip can skip
+        # the HMAC check. Routes run in threadpool workers, so every access
+        # goes through the lock.
+        self._issued_tokens: "OrderedDict[str, Tuple[str, dict]]" = OrderedDict()
+        self._issued_tokens_lock = threading.Lock()
+        self.issued_token_cache_size = 1024
+
     def generate_token(self, email: str, operation_type: str) -> str:
         """
         Generate a secure operation token for a verified email and operation.
@@ -89,15 +121,70 @@ class OperationTokenManager:
         """
         now = datetime.now(timezone.utc)
         payload = {
-            "email": email.lower(),  # Normalize email case
+            "email": _normalize_email(email),  # Normalize email case
             "operation_type": operation_type,
-            "exp": now + timedelta(minutes=self.expiry_minutes),
-            "iat": now,
+            "exp": int((now + timedelta(minutes=self.expiry_minutes)).timestamp()),
+            "iat": int(now.timestamp()),
             "jti": str(uuid.uuid4()),  # Unique token ID for single-use semantics
             "issuer": "zentropy-security",
         }
 
-        return jwt.encode(payload, self.secret_key, algorithm=self.algorithm)
+        # Sign directly with the precomputed header instead of jwt.encode;
+        # the output is a standard HS256 JWT that jwt.decode verifies as usual
+        payload_b64 = _b64url_encode(orjson.dumps(payload))
+        signing_input = f"{self._header_b64}.{payload_b64}"
+        signature = hmac.new(
+            self.secret_key.encode(), signing_input.encode(), hashlib.sha256
+        ).digest()
+        token = f"{signing_input}.{_b64url_encode(signature)}"
+
+        with self._issued_tokens_lock:
+            self._issued_tokens[token] = (self.secret_key, payload)
+            if len(self._issued_tokens) > self.issued_token_cache_size:
+                self._issued_tokens.popitem(last=False)
+
+        return token
+
+    def _decode_and_verify(self, token: str) -> dict:
+        """
+        Decode a token and verify its signature and required claims.
+
+        Shared by verify_token and get_token_info so both paths perform a
+        single decode with identical error mapping. Tokens issued by this
+        manager under the current secret key skip the signature check and
+        only have their expiry re-checked; callers get a copy of the cached
+        payload.
+
+        Args:
+            token: JWT token to decode
+
+        Returns:
+            dict: Verified token payload
+
+        Raises:
+            InvalidTokenError: If token is malformed or has invalid signature
+            ExpiredTokenError: If token has expired
+        """
+        with self._issued_tokens_lock:
+            issued = self._issued_tokens.get(token)
+            if issued is not None and issued[0] == self.secret_key:
+                if issued[1]["exp"] <= time.time():
+                    self._issued_tokens.pop(token, None)
+                    raise ExpiredTokenError("Operation token has expired")
+                self._issued_tokens.move_to_end(token)
+                return dict(issued[1])
+
+        try:
+            return jwt.decode(
+                token,
+                self.secret_key,
+                algorithms=[self.algorithm],
+                options={"require": ["exp", "iat", "jti"]},
+            )
+        except jwt.ExpiredSignatureError:
+            raise ExpiredTokenError("Operation token has expired")
+        except jwt.InvalidTokenError as e:
+            raise InvalidTokenError(f"Invalid operation token: {str(e)}")
 
     def verify_token(
         self,
@@ -128,17 +215,7 @@ class OperationTokenManager:
         Example:
             email = manager.verify_token(token, "password_reset", db, str(user.id))
         """
-        try:
-            payload = jwt.decode(
-                token,
-                self.secret_key,
-                algorithms=[self.algorithm],
-                options={"require": ["exp", "iat", "jti"]},
-            )
-        except jwt.ExpiredSignatureError:
-            raise ExpiredTokenError("Operation token has expired")
-        except jwt.InvalidTokenError as e:
-            raise InvalidTokenError(f"Invalid operation token: {str(e)}")
+        payload = self._decode_and_verify(token)
 
         # Validate operation type
         token_operation = payload.get("operation_type")
@@ -230,17 +307,7 @@ class OperationTokenManager:
             InvalidTokenError: If token is malformed or has invalid signature
             ExpiredTokenError: If token has expired
         """
-        try:
-            payload = jwt.decode(
-                token,
-                self.secret_key,
-                algorithms=[self.algorithm],
-                options={"require": ["exp", "iat", "jti"]},
-            )
-        except jwt.ExpiredSignatureError:
-            raise ExpiredTokenError("Operation token has expired")
-        except jwt.InvalidTokenError as e:
-            raise InvalidTokenError(f"Invalid operation token: {str(e)}")
+        payload = self._decode_and_verify(token)
 
         return {
             "email": payload.get("email"),
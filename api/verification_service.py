@@ -17,7 +17,7 @@ from datetime import datetime, timezone, timedelta
 from enum import Enum as PyEnum
 from typing import Optional, Dict, Any
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, func, or_, select
 
 from .database import Base, get_enum_values
 from sqlalchemy import String, Boolean, DateTime, Integer, ForeignKey, Enum, Index
@@ -214,29 +214,41 @@ class VerificationCodeService:
         return fallback_config.get(verification_type, {})
 
     @classmethod
-    def generate_code(cls) -> str:
-        """Generate a secure verification code using security configuration"""
+    def _get_code_format(cls) -> tuple[int, str]:
+        """Get verification code length and type from security configuration"""
         try:
             config = get_security_config()
-            code_length = config.verification.code_length
-            code_type = config.verification.code_type
-
-            if code_type == "alphanumeric":
-                # Generate alphanumeric code
-                chars = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
-                return "".join(secrets.choice(chars) for _ in range(code_length))
-            else:
-                # Generate numeric code (default)
-                min_val = 10 ** (code_length - 1)
-                max_val = (10**code_length) - 1
-                range_val = max_val - min_val + 1
-                code_num = secrets.randbelow(range_val) + min_val
-                return f"{code_num:0{code_length}d}"
-
+            return config.verification.code_length, config.verification.code_type
         except Exception as e:
             print(f"⚠️  Failed to get code config, using 6-digit fallback: {e}")
             # Fallback to original behavior
-            return f"{secrets.randbelow(900000) + 100000:06d}"
+            return 6, "numeric"
+
+    @staticmethod
+    def _draw_code(code_length: int, code_type: str) -> str:
+        """Draw one random code of the given length and type"""
+        if code_type == "alphanumeric":
+            # Generate alphanumeric code
+            chars = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+            return "".join(secrets.choice(chars) for _ in range(code_length))
+
+        # Generate numeric code (default)
+        min_val = 10 ** (code_length - 1)
+        max_val = (10**code_length) - 1
+        range_val = max_val - min_val + 1
+        code_num = secrets.randbelow(range_val) + min_val
+        return f"{code_num:0{code_length}d}"
+
+    @classmethod
+    def generate_code(cls) -> str:
+        """Generate a secure verification code using security configuration"""
+        return cls._draw_code(*cls._get_code_format())
+
+    @classmethod
+    def generate_codes(cls, count: int) -> list[str]:
+        """Generate several verification codes, reading the configuration once"""
+        code_length, code_type = cls._get_code_format()
+        return [cls._draw_code(code_length, code_type) for _ in range(count)]
 
     @classmethod
     def create_verification_code(
@@ -277,16 +289,15 @@ class VerificationCodeService:
         # Check hourly limit - prevent abuse
         if "hourly_limit" in config:
             hourly_cutoff = now - timedelta(hours=1)
-            hourly_count = (
-                db.query(VerificationCode)
-                .filter(
-                    and_(
-                        VerificationCode.user_id == user_id,
-                        VerificationCode.verification_type == verification_type,
-                        VerificationCode.created_at > hourly_cutoff,
-                    )
+            # Plain COUNT(*); Query.count() would wrap the query in a subquery
+            hourly_count = db.scalar(
+                select(func.count())
+                .select_from(VerificationCode)
+                .where(
+                    VerificationCode.user_id == user_id,
+                    VerificationCode.verification_type == verification_type,
+                    VerificationCode.created_at > hourly_cutoff,
                 )
-                .count()
             )
 
             if hourly_count >= config["hourly_limit"]:
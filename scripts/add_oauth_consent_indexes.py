@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Database migration to add composite OAuth consent log indexes
+
+This script brings existing oauth_consent_log tables in line with the
+indexes declared on the OAuthConsentLog SQLAlchemy model. New databases get
+them automatically from Base.metadata.create_all().
+"""
+
+import os
+from sqlalchemy import create_engine, text
+
+# (index name, CREATE statement)
+INDEXES = [
+    (
+        'idx_oauth_consent_user_provider_timestamp',
+        """
+        CREATE INDEX IF NOT EXISTS idx_oauth_consent_user_provider_timestamp
+        ON oauth_consent_log (user_id, provider, consent_timestamp)
+        INCLUDE (consent_given, revoked_at)
+        """,
+    ),
+    (
+        'idx_oauth_consent_email_provider_timestamp',
+        """
+        CREATE INDEX IF NOT EXISTS idx_oauth_consent_email_provider_timestamp
+        ON oauth_consent_log (email, provider, consent_timestamp)
+        INCLUDE (consent_given, revoked_at)
+        """,
+    ),
+]
+
+# Indexes made redundant by the composite indexes above
+OBSOLETE_INDEXES = ['idx_oauth_consent_user_provider', 'idx_oauth_consent_email']
+
+
+def get_database_url():
+    """Get the database URL from environment or use default"""
+    # Check for DATABASE_URL first
+    if os.getenv('DATABASE_URL'):
+        return os.getenv('DATABASE_URL')
+    
+    # Build from individual components
+    db_host = os.getenv('DB_HOST', 'localhost')
+    db_port = os.getenv('DB_PORT', '5432')
+    db_name = os.getenv('DB_NAME', 'zentropy')
+    db_user = os.getenv('DB_USER', 'dev_user')
+    db_password = os.getenv('DB_PASSWORD', 'dev_password')
+    
+    return f'postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}'
+
+def add_oauth_consent_indexes():
+    """Create composite OAuth consent log indexes and drop obsolete ones"""
+    database_url = get_database_url()
+    engine = create_engine(database_url)
+    
+    print(f"Connecting to database: {database_url.split('@')[1] if '@' in database_url else database_url}")
+    
+    try:
+        with engine.connect() as conn:
+            for index_name, create_sql in INDEXES:
+                conn.execute(text(create_sql))
+                print(f"✅ Ensured index {index_name}")
+            
+            for index_name in OBSOLETE_INDEXES:
+                conn.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+                print(f"✅ Dropped obsolete index {index_name}")
+            
+            # Commit the changes
+            conn.commit()
+            print("✅ Database migration completed successfully")
+            
+    except Exception as e:
+        print(f"❌ Error during migration: {e}")
+        raise
+
+def main():
+    """Main function"""
+    print("🔧 Starting OAuth consent index migration...")
+    add_oauth_consent_indexes()
+    print("🎉 Migration completed!")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Database migration to add a server-side default for consent_timestamp
+
+OAuthConsentService always sends consent_timestamp itself, so this is not
+required for inserts to succeed. The default only covers rows written
+without it (manual fixes, ad-hoc inserts) and brings existing
+oauth_consent_log tables in line with the model. New databases get it
+automatically from Base.metadata.create_all().
+"""
+
+import os
+from sqlalchemy import create_engine, text
+
+
+def get_database_url():
+    """Get the database URL from environment or use default"""
+    # Check for DATABASE_URL first
+    if os.getenv('DATABASE_URL'):
+        return os.getenv('DATABASE_URL')
+    
+    # Build from individual components
+    db_host = os.getenv('DB_HOST', 'localhost')
+    db_port = os.getenv('DB_PORT', '5432')
+    db_name = os.getenv('DB_NAME', 'zentropy')
+    db_user = os.getenv('DB_USER', 'dev_user')
+    db_password = os.getenv('DB_PASSWORD', 'dev_password')
+    
+    return f'postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}'
+
+def add_oauth_consent_timestamp_default():
+    """Set DEFAULT now() on oauth_consent_log.consent_timestamp"""
+    database_url = get_database_url()
+    engine = create_engine(database_url)
+    
+    print(f"Connecting to database: {database_url.split('@')[1] if '@' in database_url else database_url}")
+    
+    try:
+        with engine.connect() as conn:
+            # Setting a default is idempotent, so no existence check is needed
+            conn.execute(text("""
+                ALTER TABLE oauth_consent_log
+                ALTER COLUMN consent_timestamp SET DEFAULT now()
+            """))
+            print("✅ Set consent_timestamp default to now()")
+            
+            # Commit the changes
+            conn.commit()
+            print("✅ Database migration completed successfully")
+            
+    except Exception as e:
+        print(f"❌ Error during migration: {e}")
+        raise
+
+def main():
+    """Main function"""
+    print("🔧 Starting OAuth consent timestamp default migration...")
+    add_oauth_consent_timestamp_default()
+    print("🎉 Migration completed!")
+
+if __name__ == '__main__':
+    main()
@@ -9,11 +9,11 @@ Tests for registration_type field that tracks how users initially registered:
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
-from api.main import app
 from api.database import User, RegistrationType
 from api.schemas import UserCreate
+from api.routers import auth as auth_router
 
 class TestRegistrationTypeEnum:
     """Test RegistrationType enum values and database constraints."""
@@ -186,7 +186,6 @@ class TestRegistrationTypeInResponses:
         assert "message" in response_data
         
         # Verify the user after registration to test login
-        from api.database import User
         user = db.query(User).filter(User.email == "response@example.com").first()
         user.email_verified = True  # Manually verify for testing
         db.commit()
@@ -203,9 +202,10 @@ class TestRegistrationTypeInResponses:
         assert "registration_type" in user_data_response
         assert user_data_response["registration_type"] == "email"
 
-    @patch('api.routers.auth.process_google_oauth')
-    def test_google_oauth_response_includes_registration_type(self, mock_process_oauth, client):
+    def test_google_oauth_response_includes_registration_type(self, client, monkeypatch):
         """Test that Google OAuth responses include registration_type field."""
+        mock_process_oauth = Mock()
+        monkeypatch.setattr(auth_router, "process_google_oauth", mock_process_oauth)
         mock_process_oauth.return_value = {
             "access_token": "test-token",
             "token_type": "bearer",
@@ -12,7 +12,6 @@ from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 import uuid
 
-from api.main import app
 from api.database import User, RegistrationType, UserRole
 
 # Note: Using isolated test database fixtures from conftest.py
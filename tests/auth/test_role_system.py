@@ -15,7 +15,6 @@ from sqlalchemy.orm import Session
 from unittest.mock import patch
 import uuid
 
-from api.main import app
 from api.database import UserRole, TeamRole, InvitationStatus
 from api.database import User, Team, TeamMembership, TeamInvitation
 from api.schemas import UserCreate, TeamCreate, TeamInvitationCreate
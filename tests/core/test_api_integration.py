@@ -5,38 +5,12 @@ Tests core API functionality matching current implementation.
 Focuses on smoke tests and critical path validation.
 """
 import pytest
-from fastapi.testclient import TestClient
-
-from api.main import app
-
-
-class TestHealthAndCore:
-    """Test core API functionality and health endpoints."""
-    
-    def test_health_endpoint(self, client):
-        """Test /health endpoint returns expected structure."""
-        response = client.get("/health")
-        
-        assert response.status_code == 200
-        data = response.json()
-        assert "status" in data
-        assert "database" in data  
-        assert "timestamp" in data
-        assert data["status"] == "ok"
-    
-    def test_root_endpoint(self, client):
-        """Test root endpoint returns basic info."""
-        response = client.get("/")
-        
-        assert response.status_code == 200
-        data = response.json()
-        assert "message" in data
 
 
 class TestAuthenticationFlow:
     """Test authentication endpoints with actual API behavior."""
     
-    def test_registration_endpoint_success(self, client):
+    async def test_registration_endpoint_success(self, async_client):
         """Test successful user registration with valid data."""
         # Arrange
         import uuid
@@ -51,7 +25,7 @@ class TestAuthenticationFlow:
         }
         
         # Act
-        response = client.post("/api/v1/auth/register", json=registration_data)
+        response = await async_client.post("/api/v1/auth/register", json=registration_data)
         
         # Assert - Test the API response behavior (security fix: no auto-login)
         assert response.status_code == 201
@@ -64,35 +38,35 @@ class TestAuthenticationFlow:
         # API contract testing above provides sufficient validation for integration layer
         # Database-level verification is handled by unit tests in dedicated database test modules
     
-    def test_registration_endpoint_missing_required_fields(self, client):
-        """Test registration with missing required fields returns 422."""
-        incomplete_data = {
-            "first_name": "Test",
-            "email": "test@example.com"
-            # Missing: last_name, password, terms_agreement
-        }
-        
-        response = client.post("/api/v1/auth/register", json=incomplete_data)
+    @pytest.mark.parametrize("registration_data", [
+        pytest.param(
+            {
+                "first_name": "Test",
+                "email": "test@example.com"
+                # Missing: last_name, password, terms_agreement
+            },
+            id="missing-required-fields",
+        ),
+        pytest.param(
+            {
+                "first_name": "Test",
+                "last_name": "User",
+                "email": "not-an-email",
+                "password": "MyS3cur3P@ssw0rd!",
+                "terms_agreement": True
+            },
+            id="invalid-email-format",
+        ),
+    ])
+    async def test_registration_endpoint_invalid_payload(self, async_client, registration_data):
+        """Test registration with missing fields or a malformed email returns 422."""
+        response = await async_client.post("/api/v1/auth/register", json=registration_data)
         
         assert response.status_code == 422
         data = response.json()
         assert "detail" in data
     
-    def test_registration_endpoint_invalid_email_format(self, client):
-        """Test registration with invalid email format returns 422."""
-        invalid_data = {
-            "first_name": "Test",
-            "last_name": "User",
-            "email": "not-an-email",
-            "password": "MyS3cur3P@ssw0rd!",
-            "terms_agreement": True
-        }
-        
-        response = client.post("/api/v1/auth/register", json=invalid_data)
-        
-        assert response.status_code == 422
-    
-    def test_registration_endpoint_duplicate_email(self, client):
+    async def test_registration_endpoint_duplicate_email(self, async_client):
         """Test registration with duplicate email returns 400."""
         # Create first user
         import uuid
@@ -107,7 +81,7 @@ class TestAuthenticationFlow:
         }
         
         # First registration should succeed
-        first_response = client.post("/api/v1/auth/register", json=registration_data)
+        first_response = await async_client.post("/api/v1/auth/register", json=registration_data)
         assert first_response.status_code == 201
         
         # Try to create second user with same email
@@ -121,7 +95,7 @@ class TestAuthenticationFlow:
         }
         
         # Second registration should fail with duplicate email error
-        duplicate_response = client.post("/api/v1/auth/register", json=duplicate_data)
+        duplicate_response = await async_client.post("/api/v1/auth/register", json=duplicate_data)
         assert duplicate_response.status_code == 409  # 409 Conflict is more appropriate for duplicates
         data = duplicate_response.json()
         assert "detail" in data
@@ -141,9 +115,9 @@ class TestAuthenticationFlow:
         # API behavior validation above confirms duplicate email protection works correctly
         # Database-level verification is handled by unit tests in dedicated database test modules
     
-    def test_login_endpoint_invalid_credentials(self, client):
+    async def test_login_endpoint_invalid_credentials(self, async_client):
         """Test login with invalid credentials returns 401."""
-        response = client.post(
+        response = await async_client.post(
             "/api/v1/auth/login-json",
             json={
                 "email": "nonexistent@example.com",
@@ -156,66 +130,31 @@ class TestAuthenticationFlow:
         assert "detail" in data
         assert "email or password" in data["detail"].lower()
     
-    def test_login_endpoint_missing_fields(self, client):
-        """Test login with missing fields returns 422."""
-        response = client.post(
-            "/api/v1/auth/login-json",
-            json={"email": "test@example.com"}  # Missing password
-        )
+    @pytest.mark.parametrize("login_data", [
+        pytest.param({"email": "test@example.com"}, id="missing-password"),
+        pytest.param({"password": "somepassword"}, id="missing-email"),
+        pytest.param({}, id="empty-body"),
+        pytest.param(
+            {"email": "not-an-email", "password": "somepassword"},
+            id="invalid-email-format",
+        ),
+    ])
+    async def test_login_endpoint_invalid_payload(self, async_client, login_data):
+        """Test login with missing fields or a malformed email returns 422."""
+        response = await async_client.post("/api/v1/auth/login-json", json=login_data)
         
         assert response.status_code == 422
         data = response.json()
         assert "detail" in data
-    
-    def test_login_endpoint_invalid_email_format(self, client):
-        """Test login with invalid email format returns 422."""
-        response = client.post(
-            "/api/v1/auth/login-json", 
-            json={
-                "email": "not-an-email",
-                "password": "somepassword"
-            }
-        )
-        
-        assert response.status_code == 422
 
 
 class TestAPIStructure:
     """Test API structure and endpoint availability."""
     
-    def test_api_docs_available(self, client):
-        """Test that API documentation is available."""
-        response = client.get("/docs")
-        assert response.status_code == 200
-    
-    def test_openapi_schema_available(self, client):
+    async def test_openapi_schema_available(self, async_client):
         """Test that OpenAPI schema is available."""  
-        response = client.get("/openapi.json")
+        response = await async_client.get("/openapi.json")
         assert response.status_code == 200
         data = response.json()
         assert "openapi" in data
-        assert "info" in data
-
-
-class TestCORS:
-    """Test CORS configuration."""
-    
-    def test_cors_headers_present(self, client):
-        """Test that CORS headers are properly configured."""
-        response = client.options("/health")
-        # Should not error and should handle preflight
-        assert response.status_code in [200, 204, 405]  # Different servers handle OPTIONS differently
-
-
-class TestErrorHandling:
-    """Test error handling across the API."""
-    
-    def test_404_for_nonexistent_endpoint(self, client):
-        """Test 404 response for non-existent endpoints."""
-        response = client.get("/api/nonexistent")
-        assert response.status_code == 404
-    
-    def test_405_for_wrong_method(self, client):
-        """Test 405 response for wrong HTTP method."""
-        response = client.put("/health")  # Health only supports GET
-        assert response.status_code == 405
\ No newline at end of file
+        assert "info" in data
\ No newline at end of file
@@ -281,17 +281,19 @@ class TestAppIntegration:
     """Test overall app integration and functionality."""
     
     def test_all_core_endpoints_accessible(self, client):
-        """Test that all core endpoints are accessible."""
+        """Test that all core endpoints respond with the expected status."""
         endpoints = [
-            ("/", 200),
-            ("/health", 200),
-            ("/docs", 200),
-            ("/openapi.json", 200),
+            ("GET", "/", 200),
+            ("GET", "/health", 200),
+            ("GET", "/docs", 200),
+            ("GET", "/openapi.json", 200),
+            ("GET", "/api/nonexistent", 404),
+            ("PUT", "/health", 405),  # Health only supports GET
         ]
         
-        for endpoint, expected_status in endpoints:
-            response = client.get(endpoint)
-            assert response.status_code == expected_status, f"Endpoint {endpoint} returned {response.status_code}"
+        for method, endpoint, expected_status in endpoints:
+            response = client.request(method, endpoint)
+            assert response.status_code == expected_status, f"{method} {endpoint} returned {response.status_code}"
     
     def test_app_metadata_is_correct(self):
         """Test that app metadata is correctly configured."""
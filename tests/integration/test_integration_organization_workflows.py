@@ -91,10 +91,10 @@ class TestRegistrationWithOrganizationDiscovery:
 
         # Test organization lookup performance via organization API (just-in-time system)
         import time
-        start_time = time.time()
+        start_time = time.perf_counter()
         org_check = client.get("/api/v1/organizations/check-domain", 
                               params={"email": "user@company5.com"})
-        end_time = time.time()
+        end_time = time.perf_counter()
         
         assert org_check.status_code == 200
         assert (end_time - start_time) < 1.0  # Should be fast
@@ -676,9 +676,9 @@ class TestDataMigrationReadiness:
         
         # System should handle queries efficiently
         import time
-        start_time = time.time()
+        start_time = time.perf_counter()
         count = db.query(User).filter(User.organization_id.is_(None)).count()
-        end_time = time.time()
+        end_time = time.perf_counter()
         
         assert count >= 10
         assert (end_time - start_time) < 1.0  # Should be performant
\ No newline at end of file
@@ -644,11 +644,11 @@ class TestPerformanceEdgeCases:
         # Test domain checking performance
         import time
 
-        start_time = time.time()
+        start_time = time.perf_counter()
         response = client.get(
             "/api/v1/organizations/check-domain", params={"email": "user@corp025.com"}
         )
-        end_time = time.time()
+        end_time = time.perf_counter()
 
         assert response.status_code == 200
         assert (end_time - start_time) < 2.0  # Should be reasonably fast
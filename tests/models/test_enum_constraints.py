@@ -15,7 +15,6 @@ import uuid
 from sqlalchemy.exc import DataError, IntegrityError, StatementError
 from fastapi.testclient import TestClient
 
-from api.main import app
 from api.database import User, Organization, TeamMembership, TeamInvitation
 from api.database import UserRole, AuthProvider, RegistrationType, TeamRole, InvitationStatus
 from api.database import IndustryType, OrganizationType
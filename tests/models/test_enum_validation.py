@@ -10,7 +10,8 @@ from fastapi.testclient import TestClient
 from unittest.mock import patch
 from sqlalchemy.orm import Session
 
-from api.main import app
+from api.database import User
+
 
 class TestAPIEnumValidation:
     """Test that API endpoints properly validate enum inputs."""
@@ -118,7 +119,6 @@ class TestEnumAPIResponseConsistency:
         assert response.status_code == 201
         
         # Verify the user's email to enable login
-        from api.database import User
         from api.verification_service import VerificationCode, VerificationType
         user = db.query(User).filter(User.email == "enum-response@example.com").first()
         assert user is not None
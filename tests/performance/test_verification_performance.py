@@ -23,6 +23,7 @@ from datetime import datetime, timezone, timedelta
 from typing import List, Dict, Any
 from uuid import uuid4
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from api.verification_service import VerificationCodeService, VerificationType, VerificationCode
 from api.database import UsedOperationToken, SessionLocal
@@ -156,17 +157,18 @@ class TestDatabaseIndexPerformance:
         # Create expired verification codes
         expired_time = datetime.now(timezone.utc) - timedelta(days=2)
         
-        for i in range(100):
-            verification_code = VerificationCode(
-                user_id=uuid4(),
-                verification_type=VerificationType.EMAIL_VERIFICATION,
-                code=f"{100000 + i:06d}",
-                expires_at=expired_time,
-                max_attempts=3,
-                is_used=True
-            )
-            db.add(verification_code)
-        
+        # One executemany INSERT instead of 100 unit-of-work flushes
+        db.execute(insert(VerificationCode), [
+            {
+                "user_id": uuid4(),
+                "verification_type": VerificationType.EMAIL_VERIFICATION,
+                "code": f"{100000 + i:06d}",
+                "expires_at": expired_time,
+                "max_attempts": 3,
+                "is_used": True,
+            }
+            for i in range(100)
+        ])
         db.commit()
         
         def run_cleanup():
@@ -186,7 +188,7 @@ class TestDatabaseIndexPerformance:
 class TestBackgroundCleanupPerformance:
     """Test background cleanup service performance and behavior"""
     
-    def test_cleanup_service_batch_performance(self, db, test_rate_limits):
+    async def test_cleanup_service_batch_performance(self, db, test_rate_limits):
         """Test that cleanup service processes batches efficiently and behaves correctly"""
         cleanup_service = CleanupService()
         
@@ -194,38 +196,35 @@ class TestBackgroundCleanupPerformance:
         expired_time = datetime.now(timezone.utc) - timedelta(days=1)
         
         # Create expired verification codes
-        for i in range(500):  # Larger batch for realistic testing
-            verification_code = VerificationCode(
-                user_id=uuid4(),
-                verification_type=VerificationType.EMAIL_VERIFICATION,
-                code=f"{100000 + i:06d}",
-                expires_at=expired_time,
-                max_attempts=3,
-                is_used=True
-            )
-            db.add(verification_code)
+        db.execute(insert(VerificationCode), [
+            {
+                "user_id": uuid4(),
+                "verification_type": VerificationType.EMAIL_VERIFICATION,
+                "code": f"{100000 + i:06d}",
+                "expires_at": expired_time,
+                "max_attempts": 3,
+                "is_used": True,
+            }
+            for i in range(500)  # Larger batch for realistic testing
+        ])
         
         # Create expired operation tokens
-        for i in range(200):
-            token = UsedOperationToken(
-                jti=str(uuid4()),
-                user_id=uuid4(),
-                operation_type="password_change",
-                email=f"test{i}@example.com",
-                expires_at=expired_time
-            )
-            db.add(token)
+        db.execute(insert(UsedOperationToken), [
+            {
+                "jti": str(uuid4()),
+                "user_id": uuid4(),
+                "operation_type": "password_change",
+                "email": f"test{i}@example.com",
+                "expires_at": expired_time,
+            }
+            for i in range(200)
+        ])
         
         db.commit()
         
         # Test batch cleanup performance
-        async def run_cleanup():
-            return await cleanup_service.manual_cleanup(db_session=db)
-        
-        import asyncio
-        
         start_time = time.perf_counter()
-        result = asyncio.run(run_cleanup())
+        result = await cleanup_service.manual_cleanup(db_session=db)
         end_time = time.perf_counter()
         
         execution_time = (end_time - start_time) * 1000  # Convert to milliseconds
@@ -7,6 +7,15 @@ from sqlalchemy.orm import Session
 
 from api.database import User, AuthProvider
 from api.auth import get_password_hash
+from api.routers import users as users_router
+
+
+@pytest.fixture
+def mock_verify_google_token(monkeypatch):
+    """Replaces the users router's verify_google_token with a MagicMock."""
+    mock = MagicMock()
+    monkeypatch.setattr(users_router, "verify_google_token", mock)
+    return mock
 
 
 class TestAccountLinking:
@@ -82,13 +91,12 @@ class TestAccountLinking:
         assert data["google_auth_linked"] is True  # Has Google ID
         assert data["google_email"] == "hybrid@example.com"
 
-    @patch("api.routers.users.verify_google_token")
     def test_link_google_account_success(
-        self, mock_verify_token, client: TestClient, db: Session, auth_headers: dict
+        self, client: TestClient, db: Session, auth_headers: dict, mock_verify_google_token
     ):
         """Test successful Google account linking."""
         # Mock Google token verification
-        mock_verify_token.return_value = {
+        mock_verify_google_token.return_value = {
             "email": "current@user.com",  # Matches current user
             "id": "google_id_123",
             "email_verified": True,
@@ -104,13 +112,12 @@ class TestAccountLinking:
         assert response.status_code == 200
         assert response.json()["message"] == "Google account linked successfully"
 
-    @patch("api.routers.users.verify_google_token")
     def test_link_google_account_email_mismatch(
-        self, mock_verify_token, client: TestClient, db: Session, auth_headers: dict
+        self, client: TestClient, db: Session, auth_headers: dict, mock_verify_google_token
     ):
         """Test linking fails when Google email doesn't match user email."""
         # Mock Google token with different email
-        mock_verify_token.return_value = {
+        mock_verify_google_token.return_value = {
             "email": "different@email.com",
             "id": "google_id_123",
             "email_verified": True,
@@ -125,9 +132,8 @@ class TestAccountLinking:
         assert response.status_code == 400
         assert "Google email must match your account email" in response.json()["detail"]
 
-    @patch("api.routers.users.verify_google_token")
     def test_link_google_account_already_linked_to_another_user(
-        self, mock_verify_token, client: TestClient, db: Session, auth_headers: dict
+        self, client: TestClient, db: Session, auth_headers: dict, mock_verify_google_token
     ):
         """Test linking fails when Google ID is already linked to another user."""
         # Create another user with the Google ID
@@ -143,7 +149,7 @@ class TestAccountLinking:
         db.commit()
 
         # Mock Google token verification
-        mock_verify_token.return_value = {
+        mock_verify_google_token.return_value = {
             "email": "current@user.com",
             "id": "google_id_123",  # Same Google ID as other user
             "email_verified": True,
@@ -158,9 +164,8 @@ class TestAccountLinking:
         assert response.status_code == 409
         assert "already linked to another user" in response.json()["detail"]
 
-    @patch("api.routers.users.verify_google_token")
     def test_link_google_account_already_linked(
-        self, mock_verify_token, client: TestClient, db: Session, current_user: User, auth_headers: dict
+        self, client: TestClient, db: Session, current_user: User, auth_headers: dict, mock_verify_google_token
     ):
         """Test linking fails when user already has Google account linked."""
         # Set Google ID on current user
@@ -168,7 +173,7 @@ class TestAccountLinking:
         db.commit()
 
         # Mock Google token verification
-        mock_verify_token.return_value = {
+        mock_verify_google_token.return_value = {
             "email": "current@user.com",
             "id": "google_id_123",
             "email_verified": True,
@@ -15,7 +15,6 @@ import uuid
 from datetime import datetime
 
 from api.database import Base, User, AuthProvider, get_db
-from api.main import app
 from api.schemas import LoginResponse
 
 
@@ -31,9 +30,26 @@ class TestGoogleOAuthEndpoint:
 class TestGoogleTokenVerification:
     """Tests for Google token verification function (will be implemented)."""
     
-    @patch('google.auth.transport.requests.Request')
-    @patch('google.oauth2.id_token.verify_oauth2_token')
-    def test_verify_google_token_valid_token(self, mock_verify_token, mock_request, client):
+    @pytest.fixture(scope="class")
+    def google_auth_mocks(self):
+        """
+        Patches Google's token verification once for the whole class.
+        
+        Tests reach the shared mocks through mock_verify_token, which resets
+        them first so no return_value or side_effect leaks between tests.
+        """
+        with patch('google.auth.transport.requests.Request') as mock_request, \
+                patch('google.oauth2.id_token.verify_oauth2_token') as mock_verify_token:
+            yield mock_verify_token, mock_request
+    
+    @pytest.fixture
+    def mock_verify_token(self, google_auth_mocks):
+        """Returns the class-wide verify_oauth2_token mock, reset for this test."""
+        for mock in google_auth_mocks:
+            mock.reset_mock(return_value=True, side_effect=True)
+        return google_auth_mocks[0]
+    
+    def test_verify_google_token_valid_token(self, mock_verify_token, client):
         """Test Google token verification with valid token."""
         # Mock Google's verification response
         mock_verify_token.return_value = {
@@ -59,7 +75,6 @@ class TestGoogleTokenVerification:
             # Expected to fail until implementation
             assert True  # Test passes because function doesn't exist yet
     
-    @patch('google.oauth2.id_token.verify_oauth2_token')
     def test_verify_google_token_invalid_token(self, mock_verify_token, client):
         """Test Google token verification with invalid token."""
         # Mock Google's rejection
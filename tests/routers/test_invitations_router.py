@@ -26,6 +26,11 @@ from api.schemas import TeamInvitationCreate, TeamInvitationResponse
 from tests.conftest import create_test_user, create_test_team
 
 
+# Expiry times for invitations seeded directly into the database. Computed
+# once at import; a test session is far shorter than either offset.
+VALID_EXPIRES_AT = datetime.now(timezone.utc) + timedelta(days=7)
+EXPIRED_AT = datetime.now(timezone.utc) - timedelta(days=1)
+
 class TestInvitationCreation:
     """Test POST /api/v1/invitations/ endpoint - most complex business logic"""
     
@@ -253,7 +258,7 @@ class TestInvitationCreation:
             email="newuser@example.com",
             role=TeamRole.MEMBER,
             invited_by=current_user.id,
-            expires_at=datetime.now(timezone.utc) + timedelta(days=7)
+            expires_at=VALID_EXPIRES_AT
         )
         db.add(existing_invitation)
         db.commit()
@@ -308,7 +313,7 @@ class TestInvitationRetrieval:
             email=current_user.email,
             role=TeamRole.MEMBER,
             invited_by=inviter.id,
-            expires_at=datetime.now(timezone.utc) + timedelta(days=7)
+            expires_at=VALID_EXPIRES_AT
         )
         db.add(invitation)
         db.commit()
@@ -340,7 +345,7 @@ class TestInvitationRetrieval:
             email=current_user.email,
             role=TeamRole.MEMBER,
             invited_by=inviter.id,
-            expires_at=datetime.now(timezone.utc) - timedelta(days=1)  # Expired
+            expires_at=EXPIRED_AT  # Expired
         )
         
         # Create valid invitation
@@ -349,7 +354,7 @@ class TestInvitationRetrieval:
             email=current_user.email,
             role=TeamRole.LEAD,
             invited_by=inviter.id,
-            expires_at=datetime.now(timezone.utc) + timedelta(days=7)  # Valid
+            expires_at=VALID_EXPIRES_AT  # Valid
         )
         
         db.add_all([expired_invitation, valid_invitation])
@@ -380,7 +385,7 @@ class TestInvitationRetrieval:
             role=TeamRole.MEMBER,
             invited_by=inviter.id,
             status=InvitationStatus.PENDING,
-            expires_at=datetime.now(timezone.utc) + timedelta(days=7)
+            expires_at=VALID_EXPIRES_AT
         )
         
         accepted_invitation = TeamInvitation(
@@ -389,7 +394,7 @@ class TestInvitationRetrieval:
             role=TeamRole.LEAD,
             invited_by=inviter.id,
             status=InvitationStatus.ACCEPTED,
-            expires_at=datetime.now(timezone.utc) + timedelta(days=7)
+            expires_at=VALID_EXPIRES_AT
         )
         
         declined_invitation = TeamInvitation(
@@ -398,7 +403,7 @@ class TestInvitationRetrieval:
             role=TeamRole.TEAM_ADMIN,
             invited_by=inviter.id,
             status=InvitationStatus.DECLINED,
-            expires_at=datetime.now(timezone.utc) + timedelta(days=7)
+            expires_at=VALID_EXPIRES_AT
         )
         
         db.add_all([pending_invitation, accepted_invitation, declined_invitation])
@@ -452,7 +457,7 @@ class TestInvitationAcceptance:
             email=current_user.email,
             role=TeamRole.MEMBER,
             invited_by=inviter.id,
-            expires_at=datetime.now(timezone.utc) + timedelta(days=7)
+            expires_at=VALID_EXPIRES_AT
         )
         db.add(invitation)
         db.commit()
@@ -503,7 +508,7 @@ class TestInvitationAcceptance:
             email="different@example.com",  # Different email
             role=TeamRole.MEMBER,
             invited_by=inviter.id,
-            expires_at=datetime.now(timezone.utc) + timedelta(days=7)
+            expires_at=VALID_EXPIRES_AT
         )
         db.add(invitation)
         db.commit()
@@ -529,7 +534,7 @@ class TestInvitationAcceptance:
             email=current_user.email,
             role=TeamRole.MEMBER,
             invited_by=inviter.id,
-            expires_at=datetime.now(timezone.utc) - timedelta(days=1)  # Expired
+            expires_at=EXPIRED_AT  # Expired
         )
         db.add(invitation)
         db.commit()
@@ -564,7 +569,7 @@ class TestInvitationAcceptance:
             email=current_user.email,
             role=TeamRole.LEAD,
             invited_by=inviter.id,
-            expires_at=datetime.now(timezone.utc) + timedelta(days=7)
+            expires_at=VALID_EXPIRES_AT
         )
         db.add(invitation)
         db.commit()
@@ -602,7 +607,7 @@ class TestInvitationDecline:
             email=current_user.email,
             role=TeamRole.MEMBER,
             invited_by=inviter.id,
-            expires_at=datetime.now(timezone.utc) + timedelta(days=7)
+            expires_at=VALID_EXPIRES_AT
         )
         db.add(invitation)
         db.commit()
@@ -652,7 +657,7 @@ class TestInvitationDecline:
             email="different@example.com",  # Different email
             role=TeamRole.MEMBER,
             invited_by=inviter.id,
-            expires_at=datetime.now(timezone.utc) + timedelta(days=7)
+            expires_at=VALID_EXPIRES_AT
         )
         db.add(invitation)
         db.commit()
@@ -678,7 +683,7 @@ class TestInvitationDecline:
             email=current_user.email,
             role=TeamRole.MEMBER,
             invited_by=inviter.id,
-            expires_at=datetime.now(timezone.utc) - timedelta(days=1)  # Expired
+            expires_at=EXPIRED_AT  # Expired
         )
         db.add(invitation)
         db.commit()
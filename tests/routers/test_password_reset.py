@@ -5,7 +5,7 @@ Tests for simplified unified email verification + password reset flow.
 import pytest
 import uuid
 from fastapi import status
-from api.database import User
+from api.database import PasswordHistory, User
 
 
 class TestPasswordResetEndpoint:
@@ -174,7 +174,6 @@ class TestPasswordResetEndpoint:
 
     def test_reset_password_rejects_recent_password(self, client, db, user_with_known_password, test_rate_limits):
         """Test that password reset rejects reusing recent passwords from history."""
-        from api.database import PasswordHistory
         from api.auth import get_password_hash
         
         current_user = user_with_known_password
@@ -456,9 +456,8 @@ class TestPasswordManagement:
         assert "Password changed successfully" in response.json()["message"]
         
         # Verify password hash changed in database
+        original_hash = user_with_known_password.password_hash
         db.refresh(user_with_known_password)
-        from api.auth import get_password_hash
-        original_hash = get_password_hash(user_with_known_password.known_password)
         assert user_with_known_password.password_hash != original_hash
         
         # Verify password history entry created
@@ -11,7 +11,6 @@ from sqlalchemy.orm import Session
 import uuid
 import random
 
-from api.main import app
 from api.database import User
 from api.verification_service import VerificationCode, VerificationType, VerificationCodeService
 
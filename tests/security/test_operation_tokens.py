@@ -66,6 +66,17 @@ class TestOperationTokenManager:
             assert 'jti' in payload
             assert payload['issuer'] == 'zentropy-security'
 
+    def test_generate_token_matches_pyjwt_encoding(self):
+        """Test that the precomputed-header token is byte-identical to jwt.encode output."""
+        with patch.dict(os.environ, {'SECRET_KEY': 'test-secret-key'}):
+            manager = OperationTokenManager()
+
+            token = manager.generate_token("test@example.com", "password_reset")
+            payload = jwt.decode(token, 'test-secret-key', algorithms=['HS256'])
+
+            assert jwt.get_unverified_header(token) == {"alg": "HS256", "typ": "JWT"}
+            assert token == jwt.encode(payload, 'test-secret-key', algorithm='HS256')
+
     def test_generate_token_normalizes_email_case(self):
         """Test that email addresses are normalized to lowercase."""
         with patch.dict(os.environ, {'SECRET_KEY': 'test-secret-key'}):
@@ -79,6 +90,16 @@ class TestOperationTokenManager:
             
             assert payload['email'] == "test@example.com"
 
+    def test_generate_token_strips_email_whitespace(self):
+        """Test that surrounding whitespace is removed during normalization."""
+        with patch.dict(os.environ, {'SECRET_KEY': 'test-secret-key'}):
+            manager = OperationTokenManager()
+
+            token = manager.generate_token("  Test@Example.com ", "password_reset")
+            payload = jwt.decode(token, 'test-secret-key', algorithms=['HS256'])
+
+            assert payload['email'] == "test@example.com"
+
     def test_generate_token_has_correct_expiration(self):
         """Test that generated tokens have correct expiration time."""
         with patch.dict(os.environ, {'SECRET_KEY': 'test-secret-key'}):
@@ -294,13 +315,51 @@ class TestSecurityProperties:
             
             # Should work immediately
             assert manager.verify_token(token, "password_reset") == "test@example.com"
-            
-            # Mock time to be after expiration
+
+            # Mock time to be after expiration (self-issued fast path)
+            with patch('api.security.time.time', return_value=time.time() + 61):
+                with pytest.raises(ExpiredTokenError, match="Operation token has expired"):
+                    manager.verify_token(token, "password_reset")
+
+            # A manager that did not issue the token runs the full decode
+            other_manager = OperationTokenManager()
             with patch('jwt.decode') as mock_decode:
                 mock_decode.side_effect = jwt.ExpiredSignatureError("Token expired")
-                
+
                 with pytest.raises(ExpiredTokenError, match="Operation token has expired"):
-                    manager.verify_token(token, "password_reset")
+                    other_manager.verify_token(token, "password_reset")
+
+    def test_self_issued_token_skips_signature_check(self):
+        """Test that tokens issued in-process verify without re-decoding."""
+        with patch.dict(os.environ, {'SECRET_KEY': 'test-secret-key'}):
+            manager = OperationTokenManager()
+            token = manager.generate_token("test@example.com", "password_reset")
+
+            with patch('jwt.decode') as mock_decode:
+                assert manager.verify_token(token, "password_reset") == "test@example.com"
+                mock_decode.assert_not_called()
+
+            # Operation type is still enforced on the fast path
+            with pytest.raises(InvalidOperationError):
+                manager.verify_token(token, "password_change")
+
+    def test_issued_token_cache_is_lru_and_returns_copies(self):
+        """Test that cache hits refresh recency and never hand out the cached dict."""
+        with patch.dict(os.environ, {'SECRET_KEY': 'test-secret-key'}):
+            manager = OperationTokenManager()
+            manager.issued_token_cache_size = 2
+            first = manager.generate_token("first@example.com", "password_reset")
+            second = manager.generate_token("second@example.com", "password_reset")
+
+            # Mutating a returned payload must not leak into later lookups
+            payload = manager._decode_and_verify(first)
+            payload["email"] = "tampered@example.com"
+            assert manager.verify_token(first, "password_reset") == "first@example.com"
+
+            # The hit on first makes second the eviction candidate
+            manager.generate_token("third@example.com", "password_reset")
+            assert first in manager._issued_tokens
+            assert second not in manager._issued_tokens
 
     def test_different_emails_get_different_tokens(self):
         """Test that different emails get different tokens even for same operation."""
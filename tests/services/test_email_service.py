@@ -11,6 +11,19 @@ import asyncio
 from api.email_service import EmailService, send_verification_email, send_password_reset_email
 
 
+@pytest.fixture
+def mock_send(monkeypatch):
+    """
+    Replaces the global email service's send_email_sync with a MagicMock.
+
+    The mock returns True by default; tests can override return_value to
+    simulate delivery failures.
+    """
+    mock = MagicMock(return_value=True)
+    monkeypatch.setattr("api.email_service.email_service.send_email_sync", mock)
+    return mock
+
+
 class TestEmailService:
     """Test the EmailService class functionality."""
     
@@ -128,15 +141,39 @@ class TestEmailService:
         assert result is False
         mock_send.assert_called_once()
 
+    @patch('api.email_service.aiosmtplib.send')
+    def test_send_email_sync_reuses_background_loop(self, mock_send):
+        """Test that repeat synchronous sends share one background event loop."""
+        from api.email_service import _get_background_loop
+
+        service = EmailService()
+        service.send_email_sync("test@example.com", "First", "<p>1</p>")
+        loop = _get_background_loop()
+        service.send_email_sync("test@example.com", "Second", "<p>2</p>")
+
+        assert _get_background_loop() is loop
+        assert not loop.is_closed()
+        assert mock_send.call_count == 2
+
+    @patch('api.email_service.aiosmtplib.send')
+    async def test_send_email_sync_inside_running_loop(self, mock_send):
+        """Test synchronous sending when called from within a running event loop."""
+        service = EmailService()
+        result = service.send_email_sync(
+            to_email="test@example.com",
+            subject="Test Subject",
+            html_content="<h1>Test HTML</h1>"
+        )
+
+        assert result is True
+        mock_send.assert_called_once()
+
 
 class TestEmailFunctions:
     """Test the email utility functions."""
     
-    @patch('api.email_service.email_service.send_email_sync')
     def test_send_verification_email(self, mock_send):
         """Test sending verification email."""
-        mock_send.return_value = True
-        
         result = send_verification_email(
             email="test@example.com",
             token="test-token-123",
@@ -155,11 +192,8 @@ class TestEmailFunctions:
         assert "test-token-123" in call_args[1]["text_content"]
         assert "Test User" in call_args[1]["text_content"]
     
-    @patch('api.email_service.email_service.send_email_sync')
     def test_send_password_reset_email(self, mock_send):
         """Test sending password reset email."""
-        mock_send.return_value = True
-        
         result = send_password_reset_email(
             email="test@example.com",
             token="reset-token-456",
@@ -178,7 +212,6 @@ class TestEmailFunctions:
         assert "reset-token-456" in call_args[1]["text_content"]
         assert "Test User" in call_args[1]["text_content"]
     
-    @patch('api.email_service.email_service.send_email_sync')
     def test_send_verification_email_failure(self, mock_send):
         """Test verification email sending failure."""
         mock_send.return_value = False
@@ -192,7 +225,6 @@ class TestEmailFunctions:
         assert result is False
         mock_send.assert_called_once()
     
-    @patch('api.email_service.email_service.send_email_sync')
     def test_send_password_reset_email_failure(self, mock_send):
         """Test password reset email sending failure."""
         mock_send.return_value = False
@@ -210,110 +242,94 @@ class TestEmailFunctions:
 class TestEmailContent:
     """Test email content generation."""
     
-    def test_verification_email_content(self):
+    def test_verification_email_content(self, mock_send):
         """Test verification email content generation."""
-        with patch('api.email_service.email_service.send_email_sync') as mock_send:
-            mock_send.return_value = True
-            
-            send_verification_email(
-                email="test@example.com",
-                token="test-token-123",
-                user_name="John Doe"
-            )
-            
-            call_args = mock_send.call_args
-            html_content = call_args[1]["html_content"]
-            text_content = call_args[1]["text_content"]
-            
-            # Check HTML content
-            assert "Welcome to Zentropy!" in html_content
-            assert "Hello John Doe," in html_content
-            assert "http://localhost:5173/verify-email/test-token-123" in html_content
-            assert "24 hours" in html_content
-            assert "Verify Email Address" in html_content
-            
-            # Check text content
-            assert "Welcome to Zentropy!" in text_content
-            assert "Hello John Doe," in text_content
-            assert "http://localhost:5173/verify-email/test-token-123" in text_content
-            assert "24 hours" in text_content
+        send_verification_email(
+            email="test@example.com",
+            token="test-token-123",
+            user_name="John Doe"
+        )
+        
+        call_args = mock_send.call_args
+        html_content = call_args[1]["html_content"]
+        text_content = call_args[1]["text_content"]
+        
+        # Check HTML content
+        assert "Welcome to Zentropy!" in html_content
+        assert "Hello John Doe," in html_content
+        assert "http://localhost:5173/verify-email/test-token-123" in html_content
+        assert "24 hours" in html_content
+        assert "Verify Email Address" in html_content
+        
+        # Check text content
+        assert "Welcome to Zentropy!" in text_content
+        assert "Hello John Doe," in text_content
+        assert "http://localhost:5173/verify-email/test-token-123" in text_content
+        assert "24 hours" in text_content
     
-    def test_email_template_security(self):
+    def test_email_template_security(self, mock_send):
         """Test that email templates properly escape user input."""
-        with patch('api.email_service.email_service.send_email_sync') as mock_send:
-            mock_send.return_value = True
-            
-            # Test with potentially malicious user input
-            send_verification_email(
-                email="test@example.com",
-                token="safe-token",
-                user_name="<script>alert('xss')</script>"
-            )
-            
-            call_args = mock_send.call_args
-            html_content = call_args[1]["html_content"]
-            
-            # Should not contain executable script tags
-            assert "<script>" not in html_content
-            assert "alert('xss')" not in html_content
-            # Should contain escaped or sanitized version
-            assert "&lt;script&gt;" in html_content or "script" not in html_content.lower()
+        # Test with potentially malicious user input
+        send_verification_email(
+            email="test@example.com",
+            token="safe-token",
+            user_name="<script>alert('xss')</script>"
+        )
+        
+        call_args = mock_send.call_args
+        html_content = call_args[1]["html_content"]
+        
+        # Should not contain executable script tags
+        assert "<script>" not in html_content
+        assert "alert('xss')" not in html_content
+        # Should contain escaped or sanitized version
+        assert "&lt;script&gt;" in html_content or "script" not in html_content.lower()
     
-    def test_email_link_formatting(self):
+    @pytest.mark.parametrize("token", [
+        "simple-token",
+        "token_with_underscores",
+        "token-with-dashes",
+        "TokenWithMixedCase123"
+    ])
+    def test_email_link_formatting(self, mock_send, token):
         """Test that email verification links are properly formatted."""
-        with patch('api.email_service.email_service.send_email_sync') as mock_send:
-            mock_send.return_value = True
-            
-            # Test with various token formats
-            test_cases = [
-                "simple-token",
-                "token_with_underscores",
-                "token-with-dashes",
-                "TokenWithMixedCase123"
-            ]
-            
-            for token in test_cases:
-                send_verification_email(
-                    email="test@example.com",
-                    token=token,
-                    user_name="Test User"
-                )
-                
-                call_args = mock_send.call_args
-                html_content = call_args[1]["html_content"]
-                
-                # Check that link is properly formatted
-                expected_link = f"http://localhost:5173/verify-email/{token}"
-                assert expected_link in html_content
-                
-                # Check that link appears in both button and text versions
-                assert f'href="{expected_link}"' in html_content
-                assert f'<a href="{expected_link}">' in html_content
+        send_verification_email(
+            email="test@example.com",
+            token=token,
+            user_name="Test User"
+        )
+        
+        html_content = mock_send.call_args[1]["html_content"]
+        
+        # Check that link is properly formatted
+        expected_link = f"http://localhost:5173/verify-email/{token}"
+        assert expected_link in html_content
+        
+        # Check that link appears in both button and text versions
+        assert f'href="{expected_link}"' in html_content
+        assert f'<a href="{expected_link}">' in html_content
     
-    def test_password_reset_email_content(self):
+    def test_password_reset_email_content(self, mock_send):
         """Test password reset email content generation."""
-        with patch('api.email_service.email_service.send_email_sync') as mock_send:
-            mock_send.return_value = True
-            
-            send_password_reset_email(
-                email="test@example.com",
-                token="reset-token-456",
-                user_name="Jane Smith"
-            )
-            
-            call_args = mock_send.call_args
-            html_content = call_args[1]["html_content"]
-            text_content = call_args[1]["text_content"]
-            
-            # Check HTML content
-            assert "Password Reset Request" in html_content
-            assert "Hello Jane Smith," in html_content
-            assert "http://localhost:5173/reset-password/reset-token-456" in html_content
-            assert "1 hour" in html_content
-            assert "Reset Password" in html_content
-            
-            # Check text content
-            assert "Password Reset Request" in text_content
-            assert "Hello Jane Smith," in text_content
-            assert "http://localhost:5173/reset-password/reset-token-456" in text_content
-            assert "1 hour" in text_content
\ No newline at end of file
+        send_password_reset_email(
+            email="test@example.com",
+            token="reset-token-456",
+            user_name="Jane Smith"
+        )
+        
+        call_args = mock_send.call_args
+        html_content = call_args[1]["html_content"]
+        text_content = call_args[1]["text_content"]
+        
+        # Check HTML content
+        assert "Password Reset Request" in html_content
+        assert "Hello Jane Smith," in html_content
+        assert "http://localhost:5173/reset-password/reset-token-456" in html_content
+        assert "1 hour" in html_content
+        assert "Reset Password" in html_content
+        
+        # Check text content
+        assert "Password Reset Request" in text_content
+        assert "Hello Jane Smith," in text_content
+        assert "http://localhost:5173/reset-password/reset-token-456" in text_content
+        assert "1 hour" in text_content
\ No newline at end of file
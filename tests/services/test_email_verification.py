@@ -14,7 +14,6 @@ from datetime import datetime, timedelta
 import uuid
 import random
 
-from api.main import app
 from api.database import User
 from api.schemas import UserCreate
 
@@ -105,7 +104,6 @@ class TestEmailVerificationEndpoints:
         assert register_response.status_code == 201
         
         # Get the verification code from database
-        from api.database import User
         from api.verification_service import VerificationCode, VerificationType
         user = db.query(User).filter(User.email == email).first()
         assert user is not None
@@ -216,7 +214,6 @@ class TestEmailVerificationFlow:
         assert register_response.status_code == 201
         
         # Get verification code from database
-        from api.database import User
         from api.verification_service import VerificationCode, VerificationType
         user = db.query(User).filter(User.email == email).first()
         assert user is not None
@@ -5,17 +5,48 @@ Tests for the OAuth consent tracking and audit system that ensures
 explicit user consent for account linking during OAuth authentication.
 """
 import pytest
-from datetime import datetime, timezone, timedelta
+from datetime import datetime
 from unittest.mock import Mock, patch
+from sqlalchemy import event, func, select, text, update
 from sqlalchemy.orm import Session
 
 from api.database import User, OAuthConsentLog
-from api.oauth_consent_service import OAuthConsentService, ConsentRequiredResponse
+from api.oauth_consent_service import (
+    OAuthConsentService,
+    ConsentRequiredResponse,
+    _json_set_key,
+)
+
+
+def capture_query_plan(db: Session, action, verb: str = "SELECT"):
+    """
+    Run action and return SQLite's EXPLAIN QUERY PLAN for the last statement it
+    issued that starts with verb.
+    
+    Diagnostic helper for asserting that service queries hit an index. The
+    plan syntax is SQLite's, so callers are marked @pytest.mark.sqlite.
+    """
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(verb):
+            captured.append((statement, parameters))
+    
+    engine = db.get_bind().engine
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        action()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    
+    statement, parameters = captured[-1]
+    rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    return " ".join(row[-1] for row in rows)
 
 
 class TestConsentRequiredResponse:
     """Test the ConsentRequiredResponse class."""
-    
+
     def test_consent_required_response_creation(self):
         """Test creating a ConsentRequiredResponse object."""
         security_context = {
@@ -39,35 +70,29 @@ class TestConsentRequiredResponse:
 
 class TestConsentDecisionRecording:
     """Test consent decision recording and audit trail."""
-    
-    def test_record_consent_given(self, db: Session):
+
+    def test_record_consent_given(self, db: Session, canonical_user, count_queries):
         """Test recording when user gives consent to link accounts."""
-        # Create a test user
-        user = User(
-            email="test@example.com",
-            password_hash="hashed_password",
-            email_verified=True
-        )
-        db.add(user)
-        db.commit()
-        db.refresh(user)
+        user = canonical_user
         
         # Record consent decision
-        OAuthConsentService.record_consent_decision(
-            db=db,
-            user=user,
-            provider="google",
-            provider_user_id="google_123456",
-            consent_given=True,
-            client_ip="192.168.1.1",
-            user_agent="Mozilla/5.0..."
-        )
+        with count_queries() as queries:
+            OAuthConsentService.record_consent_decision(
+                db=db,
+                user=user,
+                provider="google",
+                provider_user_id="google_123456",
+                consent_given=True,
+                client_ip="192.168.1.1",
+                user_agent="Mozilla/5.0..."
+            )
+        assert queries.value <= 2
         
         # Verify consent log was created
-        consent_log = db.query(OAuthConsentLog).filter(
+        consent_log = db.execute(select(OAuthConsentLog).where(
             OAuthConsentLog.user_id == user.id,
             OAuthConsentLog.provider == "google"
-        ).first()
+        )).scalar_one_or_none()
         
         assert consent_log is not None
         assert consent_log.consent_given is True
@@ -79,17 +104,15 @@ class TestConsentDecisionRecording:
         # Verify user consent tracking was updated
         assert user.oauth_consent_given["google"] is True
         assert "google" in user.oauth_consent_timestamps
-    
-    def test_record_consent_denied(self, db: Session):
+        
+        # The audit row and the user's tracking field share one app-side
+        # timestamp, at full resolution
+        tracked_at = datetime.fromisoformat(user.oauth_consent_timestamps["google"])
+        assert consent_log.consent_timestamp.replace(tzinfo=None) == tracked_at.replace(tzinfo=None)
+
+    def test_record_consent_denied(self, db: Session, canonical_user):
         """Test recording when user denies consent (creates separate account)."""
-        user = User(
-            email="test@example.com",
-            password_hash="hashed_password",
-            email_verified=True
-        )
-        db.add(user)
-        db.commit()
-        db.refresh(user)
+        user = canonical_user
         
         OAuthConsentService.record_consent_decision(
             db=db,
@@ -102,10 +125,10 @@ class TestConsentDecisionRecording:
         )
         
         # Verify consent log shows denial
-        consent_log = db.query(OAuthConsentLog).filter(
+        consent_log = db.execute(select(OAuthConsentLog).where(
             OAuthConsentLog.user_id == user.id,
             OAuthConsentLog.provider == "microsoft"
-        ).first()
+        )).scalar_one_or_none()
         
         assert consent_log.consent_given is False
         assert consent_log.client_ip == "10.0.0.1"
@@ -113,121 +136,147 @@ class TestConsentDecisionRecording:
         # Verify user consent tracking reflects denial
         assert user.oauth_consent_given["microsoft"] is False
 
-
-class TestExistingConsentChecking:
-    """Test checking for existing consent decisions."""
-    
-    def test_check_existing_consent_with_prior_acceptance(self, db: Session):
-        """Test checking consent when user previously accepted."""
-        # Create user first
-        user = User(
-            email="user@example.com",
-            password_hash="hashed_password",
-            email_verified=True
+    def test_record_consent_preserves_concurrent_provider_updates(self, db: Session, make_consent_scenario):
+        """Test that recording only patches its provider's key on the server."""
+        (user,), _ = make_consent_scenario(
+            users=[{"email": "user@example.com", "oauth_consent_given": {"github": True}}]
         )
-        db.add(user)
-        db.commit()
-        db.refresh(user)
+        user = db.merge(user)
         
-        # Create consent log for previous acceptance
-        consent_log = OAuthConsentLog(
-            user_id=user.id,
-            email="user@example.com",
-            provider="google",
-            provider_user_id="google_123",
-            consent_given=True,
-            consent_timestamp=datetime.now(timezone.utc),
-            client_ip="192.168.1.1"
+        # Another request records a decision behind this session's back
+        db.execute(
+            update(User)
+            .where(User.id == user.id)
+            .values(oauth_consent_given={"github": True, "microsoft": False})
+            .execution_options(synchronize_session=False)
         )
-        db.add(consent_log)
-        db.commit()
         
-        result = OAuthConsentService.check_existing_consent(
+        OAuthConsentService.record_consent_decision(
             db=db,
-            email="user@example.com",
-            provider="google"
+            user=user,
+            provider="google",
+            provider_user_id="google_123456",
+            consent_given=True,
+            client_ip="192.168.1.1",
+            user_agent="Test Browser"
         )
         
-        assert result is True
-    
-    def test_check_existing_consent_with_prior_denial(self, db: Session):
-        """Test checking consent when user previously denied."""
-        # Create user first
+        assert user.oauth_consent_given == {"github": True, "microsoft": False, "google": True}
+        assert "google" in user.oauth_consent_timestamps
+
+    def test_record_consent_on_json_null_tracking_fields(self, db: Session):
+        """Test that tracking fields stored as JSON null are treated as empty."""
         user = User(
-            email="user@example.com",
+            email="json-null@example.com",
             password_hash="hashed_password",
-            email_verified=True
+            email_verified=True,
+            oauth_consent_given=None,
+            oauth_consent_timestamps=None,
         )
         db.add(user)
         db.commit()
-        db.refresh(user)
+        # The JSON type saves None as the JSON text 'null', not SQL NULL
+        assert db.execute(
+            text("SELECT oauth_consent_given FROM users WHERE email = 'json-null@example.com'")
+        ).scalar_one() == "null"
         
-        consent_log = OAuthConsentLog(
-            user_id=user.id,
-            email="user@example.com",
-            provider="github",
-            provider_user_id="github_456",
-            consent_given=False,
-            consent_timestamp=datetime.now(timezone.utc),
-            client_ip="192.168.1.1"
-        )
-        db.add(consent_log)
-        db.commit()
-        
-        result = OAuthConsentService.check_existing_consent(
-            db=db,
-            email="user@example.com", 
-            provider="github"
-        )
-        
-        assert result is False
-    
-    def test_check_existing_consent_no_prior_decision(self, db: Session):
-        """Test checking consent when no prior decision exists."""
-        result = OAuthConsentService.check_existing_consent(
+        OAuthConsentService.record_consent_decision(
             db=db,
-            email="newuser@example.com",
-            provider="microsoft"
-        )
-        
-        assert result is None
-    
-    def test_check_existing_consent_most_recent_decision(self, db: Session):
-        """Test that most recent consent decision is returned."""
-        # Create user first
-        user = User(
-            email="user@example.com",
-            password_hash="hashed_password",
-            email_verified=True
-        )
-        db.add(user)
-        db.commit()
-        db.refresh(user)
-        
-        # Create older acceptance
-        old_consent = OAuthConsentLog(
-            user_id=user.id,
-            email="user@example.com",
+            user=user,
             provider="google",
-            provider_user_id="google_123",
+            provider_user_id="google_123456",
             consent_given=True,
-            consent_timestamp=datetime.now(timezone.utc) - timedelta(days=30),
-            client_ip="192.168.1.1"
+            client_ip="192.168.1.1",
+            user_agent="Test Browser"
         )
-        db.add(old_consent)
         
-        # Create newer denial
-        new_consent = OAuthConsentLog(
-            user_id=user.id,
-            email="user@example.com",
-            provider="google",
-            provider_user_id="google_123",
-            consent_given=False,
-            consent_timestamp=datetime.now(timezone.utc) - timedelta(days=1),
-            client_ip="192.168.1.2"
+        assert user.oauth_consent_given == {"google": True}
+        assert "google" in user.oauth_consent_timestamps
+
+    @pytest.mark.parametrize("provider", ['goo"gle', "google.com", "", "a b"])
+    def test_record_consent_rejects_unsafe_provider_key(self, db: Session, canonical_user, count_queries, provider):
+        """Test that provider names that can't be a JSON path key are rejected before any write."""
+        with count_queries() as queries:
+            with pytest.raises(ValueError, match="Invalid OAuth provider name"):
+                OAuthConsentService.record_consent_decision(
+                    db=db,
+                    user=canonical_user,
+                    provider=provider,
+                    provider_user_id="provider_123",
+                    consent_given=True,
+                    client_ip="192.168.1.1",
+                    user_agent="Test Browser"
+                )
+        
+        assert queries.value == 0
+
+    def test_server_side_consent_update_rejects_unsupported_dialect(self):
+        """Test that other backends fail loudly instead of getting SQLite's json_set."""
+        with pytest.raises(NotImplementedError, match="mysql"):
+            _json_set_key(User.__table__.c.oauth_consent_given, "consent_value", "mysql")
+
+    def test_record_consent_decisions_batches_statements(self, db: Session, count_queries):
+        """Test that batch recording uses a constant number of SQL statements."""
+        users = [
+            User(
+                email=f"batch{i}@example.com",
+                password_hash="hashed_password",
+                email_verified=True
+            )
+            for i in range(100)
+        ]
+        db.add_all(users)
+        db.flush()
+        
+        with count_queries() as queries:
+            OAuthConsentService.record_consent_decisions(db, [
+                {
+                    "user": user,
+                    "provider": "google",
+                    "provider_user_id": f"google_{i}",
+                    "consent_given": True,
+                    "client_ip": "192.168.1.1",
+                    "user_agent": "Test Browser",
+                }
+                for i, user in enumerate(users)
+            ])
+        
+        # One bulk INSERT for the logs and one batched UPDATE for the users
+        assert queries.value == 2
+        assert db.execute(select(func.count()).select_from(OAuthConsentLog).where(
+            OAuthConsentLog.email.like("batch%@example.com")
+        )).scalar_one() == 100
+        assert all(user.oauth_consent_given["google"] is True for user in users)
+
+    def test_record_consent_decisions_empty_batch(self, db: Session, count_queries):
+        """Test that an empty batch is a no-op instead of an all-defaults insert."""
+        with count_queries() as queries:
+            OAuthConsentService.record_consent_decisions(db, [])
+        
+        assert queries.value == 0
+        assert db.execute(select(func.count()).select_from(OAuthConsentLog)).scalar_one() == 0
+
+
+class TestExistingConsentChecking:
+    """Test checking for existing consent decisions."""
+
+    @pytest.mark.parametrize("logs,expected", [
+        pytest.param([(True, 0)], True, id="prior_acceptance"),
+        pytest.param([(False, 0)], False, id="prior_denial"),
+        pytest.param([], None, id="no_prior_decision"),
+        # Older acceptance followed by a newer denial: the denial wins
+        pytest.param([(True, 30), (False, 1)], False, id="most_recent_decision"),
+    ])
+    def test_check_existing_consent(self, db: Session, make_consent_scenario, logs, expected):
+        """Test that the most recent consent decision (or None) is returned."""
+        make_consent_scenario(
+            users=[{"email": "user@example.com"}],
+            logs=[
+                {"user": 0, "provider": "google", "consent_given": consent_given,
+                 "days_ago": days_ago}
+                for consent_given, days_ago in logs
+            ]
         )
-        db.add(new_consent)
-        db.commit()
         
         result = OAuthConsentService.check_existing_consent(
             db=db,
@@ -235,26 +284,52 @@ class TestExistingConsentChecking:
             provider="google"
         )
         
-        # Should return the most recent decision (denial)
-        assert result is False
+        assert result is expected
+
+    @pytest.mark.sqlite
+    def test_check_existing_consent_uses_composite_index(self, db: Session):
+        """Test that the latest-decision lookup is served by the composite index."""
+        plan = capture_query_plan(
+            db,
+            lambda: OAuthConsentService.check_existing_consent(
+                db=db, email="user@example.com", provider="google"
+            )
+        )
+        
+        assert "idx_oauth_consent_email_provider_timestamp" in plan
+
+    @pytest.mark.postgres
+    def test_consent_lookups_scan_covering_indexes(self, db: Session, make_consent_scenario):
+        """Test that consent lookups are served by the covering indexes on PostgreSQL."""
+        (user,), _ = make_consent_scenario(
+            users=[{"email": "user@example.com", "oauth_consent_given": {}}],
+            logs=[{"user": 0, "provider": "google"}]
+        )
+        # Tiny tables would otherwise always be sequentially scanned
+        db.execute(text("SET LOCAL enable_seqscan = off"))
+        
+        OAuthConsentService.check_existing_consent(db, "user@example.com", "google")
+        OAuthConsentService.get_all_active_consents(db, user)
+        
+        # Per-transaction counters are visible before the test rolls back
+        index_scans = dict(db.execute(text(
+            "SELECT indexrelname, idx_scan FROM pg_stat_xact_user_indexes "
+            "WHERE relname = 'oauth_consent_log'"
+        )).all())
+        assert index_scans["idx_oauth_consent_email_provider_timestamp"] > 0
+        assert index_scans["idx_oauth_consent_user_provider_timestamp"] > 0
 
 
 class TestConsentRevocation:
     """Test consent revocation functionality."""
-    
-    def test_revoke_oauth_consent_success(self, db: Session):
+
+    def test_revoke_oauth_consent_success(self, db: Session, canonical_user, now_utc):
         """Test successful consent revocation."""
-        # Create user with existing consent
-        user = User(
-            email="test@example.com",
-            password_hash="hashed_password",
-            email_verified=True,
-            oauth_consent_given={"google": True},
-            oauth_consent_timestamps={"google": datetime.now(timezone.utc).isoformat()}
-        )
-        db.add(user)
-        db.commit()
-        db.refresh(user)
+        # Give the shared user existing consent
+        user = canonical_user
+        user.oauth_consent_given = {"google": True}
+        consented_at = now_utc.isoformat()
+        user.oauth_consent_timestamps = {"google": consented_at}
         
         # Create active consent log
         consent_log = OAuthConsentLog(
@@ -263,11 +338,10 @@ class TestConsentRevocation:
             provider="google",
             provider_user_id="google_123",
             consent_given=True,
-            consent_timestamp=datetime.now(timezone.utc),
             client_ip="192.168.1.1"
         )
         db.add(consent_log)
-        db.commit()
+        db.flush()
         
         # Revoke consent
         result = OAuthConsentService.revoke_oauth_consent(
@@ -278,23 +352,46 @@ class TestConsentRevocation:
         
         assert result is True
         
-        # Verify consent was revoked
-        db.refresh(consent_log)
+        # Verify consent was revoked (the commit expired the log, so this reloads it)
         assert consent_log.revoked_at is not None
         
         # Verify user consent tracking was updated (consent removed on revocation)
         assert user.oauth_consent_given.get("google") is None
-    
-    def test_revoke_oauth_consent_no_active_consent(self, db: Session):
+        assert user.oauth_consent_timestamps["google"] != consented_at
+
+    def test_revoke_oauth_consent_preserves_concurrent_provider_updates(self, db: Session, make_consent_scenario, now_utc):
+        """Test that revocation only patches its provider's keys on the server."""
+        consented_at = now_utc.isoformat()
+        (user,), _ = make_consent_scenario(
+            users=[{
+                "email": "user@example.com",
+                "oauth_consent_given": {"google": True},
+                "oauth_consent_timestamps": {"google": consented_at},
+            }],
+            logs=[{"user": 0, "provider": "google"}]
+        )
+        user = db.merge(user)
+        
+        # Another request records a decision behind this session's back
+        db.execute(
+            update(User)
+            .where(User.id == user.id)
+            .values(
+                oauth_consent_given={"google": True, "github": True},
+                oauth_consent_timestamps={"google": consented_at, "github": consented_at},
+            )
+            .execution_options(synchronize_session=False)
+        )
+        
+        assert OAuthConsentService.revoke_oauth_consent(db, user, "google") is True
+        
+        assert user.oauth_consent_given == {"github": True}
+        assert user.oauth_consent_timestamps["github"] == consented_at
+        assert user.oauth_consent_timestamps["google"] != consented_at
+
+    def test_revoke_oauth_consent_no_active_consent(self, db: Session, canonical_user):
         """Test revoking consent when no active consent exists."""
-        user = User(
-            email="test@example.com",
-            password_hash="hashed_password",
-            email_verified=True
-        )
-        db.add(user)
-        db.commit()
-        db.refresh(user)
+        user = canonical_user
         
         result = OAuthConsentService.revoke_oauth_consent(
             db=db,
@@ -307,123 +404,122 @@ class TestConsentRevocation:
 
 class TestUserConsentStatus:
     """Test checking user's overall consent status."""
-    
-    def test_user_has_active_consent_from_user_model(self, db: Session):
+
+    def test_user_has_active_consent_from_user_model(self, db: Session, canonical_user):
         """Test checking consent from user model (fast path)."""
-        user = User(
-            email="test@example.com",
-            password_hash="hashed_password",
-            email_verified=True,
-            oauth_consent_given={"google": True, "github": False}
-        )
-        db.add(user)
-        db.commit()
+        user = canonical_user
+        user.oauth_consent_given = {"google": True, "github": False}
         
         # Test positive consent
         assert OAuthConsentService.has_active_consent(db, user, "google") is True
         
         # Test negative consent
         assert OAuthConsentService.has_active_consent(db, user, "github") is False
-    
-    def test_user_has_active_consent_fallback_to_db(self, db: Session):
+
+    def test_user_has_active_consent_fallback_to_db(self, db: Session, make_consent_scenario):
         """Test falling back to database when user model has no consent data."""
-        user = User(
-            email="test@example.com",
-            password_hash="hashed_password",
-            email_verified=True,
-            oauth_consent_given={}
-        )
-        db.add(user)
-        db.commit()
-        db.refresh(user)
-        
-        # Create consent log
-        consent_log = OAuthConsentLog(
-            user_id=user.id,
-            email=user.email,
-            provider="microsoft",
-            provider_user_id="microsoft_789",
-            consent_given=True,
-            consent_timestamp=datetime.now(timezone.utc),
-            client_ip="192.168.1.1"
+        (user,), _ = make_consent_scenario(
+            users=[{"email": "test@example.com", "oauth_consent_given": {}}],
+            logs=[{"user": 0, "provider": "microsoft", "provider_user_id": "microsoft_789"}]
         )
-        db.add(consent_log)
-        db.commit()
         
         result = OAuthConsentService.has_active_consent(db, user, "microsoft")
         assert result is True
 
-
-class TestConsentLogCleanup:
-    """Test consent log cleanup for data retention."""
-    
-    def test_cleanup_expired_consent_logs(self, db: Session):
-        """Test cleaning up old consent logs while preserving recent decisions."""
-        # Create users first
-        user1 = User(
-            email="user@example.com",
-            password_hash="hashed_password",
-            email_verified=True
+    def test_has_active_consent_fallback_matches_logs_by_email(self, db: Session, make_consent_scenario):
+        """Test that the fallback counts decisions logged under the email by another user row."""
+        (_, user), _ = make_consent_scenario(
+            users=[
+                {"email": "old-account@example.com"},
+                {"email": "test@example.com", "oauth_consent_given": {}},
+            ],
+            # Recorded under this email before the current user row existed
+            logs=[{"user": 0, "provider": "github", "email": "test@example.com"}]
         )
-        user2 = User(
-            email="other@example.com",
-            password_hash="hashed_password",
-            email_verified=True
-        )
-        db.add_all([user1, user2])
-        db.commit()
-        db.refresh(user1)
-        db.refresh(user2)
-        
-        # Create very old log for user1/google (should be cleaned up)
-        very_old_log = OAuthConsentLog(
-            user_id=user1.id,
-            email="user@example.com",
-            provider="google",
-            provider_user_id="google_123",
-            consent_given=False,
-            consent_timestamp=datetime.now(timezone.utc) - timedelta(days=500),
-            client_ip="192.168.1.1"
-        )
-        db.add(very_old_log)
-        
-        # Create old log for user1/google (most recent for this combo, should be preserved)
-        old_log = OAuthConsentLog(
-            user_id=user1.id,
-            email="user@example.com",
-            provider="google",
-            provider_user_id="google_123",
-            consent_given=True,
-            consent_timestamp=datetime.now(timezone.utc) - timedelta(days=400),
-            client_ip="192.168.1.1"
+
+        assert OAuthConsentService.check_existing_consent(db, "test@example.com", "github") is True
+        assert OAuthConsentService.has_active_consent(db, user, "github") is True
+
+    def test_get_all_active_consents_latest_per_provider(self, db: Session, make_consent_scenario, now_utc):
+        """Test that every provider's latest non-revoked decision is returned."""
+        (user,), _ = make_consent_scenario(
+            users=[{"email": "test@example.com"}],
+            logs=[
+                {"user": 0, "provider": "google", "consent_given": True, "days_ago": 30},
+                {"user": 0, "provider": "google", "consent_given": False, "days_ago": 1},
+                {"user": 0, "provider": "github", "consent_given": True},
+                {"user": 0, "provider": "microsoft", "consent_given": True,
+                 "revoked_at": now_utc},
+            ]
+        )
+        
+        consents = OAuthConsentService.get_all_active_consents(db, user)
+        
+        assert consents == {"google": False, "github": True}
+
+    def test_has_active_consent_fallback_single_query(self, db: Session, make_consent_scenario, count_queries):
+        """Test that checking several providers issues one consent query."""
+        (user,), _ = make_consent_scenario(
+            users=[{"email": "test@example.com", "oauth_consent_given": {}}],
+            logs=[{"user": 0, "provider": "github"}]
         )
-        db.add(old_log)
         
-        # Create recent log (should be preserved)
-        recent_log = OAuthConsentLog(
-            user_id=user1.id,
-            email="user@example.com",
-            provider="github",
-            provider_user_id="github_456",
-            consent_given=False,
-            consent_timestamp=datetime.now(timezone.utc) - timedelta(days=30),
-            client_ip="192.168.1.2"
-        )
-        db.add(recent_log)
+        with count_queries() as queries:
+            results = {
+                provider: OAuthConsentService.has_active_consent(db, user, provider)
+                for provider in ("google", "microsoft", "github")
+            }
         
-        # Create another old log but it's the most recent for its user/provider
-        # (should be preserved to maintain consent status)
-        important_old_log = OAuthConsentLog(
-            user_id=user2.id,
-            email="other@example.com",
-            provider="google",
-            provider_user_id="google_789",
-            consent_given=True,
-            consent_timestamp=datetime.now(timezone.utc) - timedelta(days=400),
-            client_ip="192.168.1.3"
-        )
-        db.add(important_old_log)
-        db.commit()
+        assert results == {"google": False, "microsoft": False, "github": True}
+        assert queries.value == 1
+
+    def test_has_active_consent_memoized_per_session(self, db: Session, make_consent_scenario):
+        """Test that fallback lookups are cached for the session until invalidated."""
+        (user,), _ = make_consent_scenario(
+            users=[{"email": "test@example.com", "oauth_consent_given": {}}],
+            logs=[{"user": 0, "provider": "github"}]
+        )
+        
+        with patch.object(
+            OAuthConsentService, "get_all_active_consents",
+            wraps=OAuthConsentService.get_all_active_consents
+        ) as lookup:
+            assert OAuthConsentService.has_active_consent(db, user, "github") is True
+            assert OAuthConsentService.has_active_consent(db, user, "github") is True
+            assert lookup.call_count == 1
+            
+            # A new session (request) starts with an empty cache
+            with Session(bind=db.connection()) as other_db:
+                OAuthConsentService.has_active_consent(other_db, user, "github")
+            assert lookup.call_count == 2
+            
+            OAuthConsentService.invalidate_consent_cache(db, user)
+            OAuthConsentService.has_active_consent(db, user, "github")
+            assert lookup.call_count == 3
+
+
+class TestConsentLogCleanup:
+    """Test consent log cleanup for data retention."""
+
+    def test_cleanup_expired_consent_logs(self, db: Session, make_consent_scenario):
+        """Test cleaning up old consent logs while preserving recent decisions."""
+        _, logs = make_consent_scenario(
+            users=[{"email": "user@example.com"}, {"email": "other@example.com"}],
+            logs=[
+                # Very old log for user1/google (should be cleaned up)
+                {"user": 0, "provider": "google", "consent_given": False, "days_ago": 500},
+                # Old log for user1/google (most recent for this combo, should be preserved)
+                {"user": 0, "provider": "google", "consent_given": True, "days_ago": 400},
+                # Recent log (should be preserved)
+                {"user": 0, "provider": "github", "provider_user_id": "github_456",
+                 "consent_given": False, "days_ago": 30, "client_ip": "192.168.1.2"},
+                # Another old log but it's the most recent for its user/provider
+                # (should be preserved to maintain consent status)
+                {"user": 1, "provider": "google", "provider_user_id": "google_789",
+                 "consent_given": True, "days_ago": 400, "client_ip": "192.168.1.3"},
+            ]
+        )
+        very_old_log, old_log, recent_log, important_old_log = logs
         
         # Clean up logs older than 365 days
         cleaned_count = OAuthConsentService.cleanup_expired_consent_logs(db, days_to_keep=365)
@@ -432,22 +528,52 @@ class TestConsentLogCleanup:
         assert cleaned_count == 1  # Only the very old log should be cleaned
         
         # Verify very old log was cleaned up
-        assert db.query(OAuthConsentLog).filter(OAuthConsentLog.id == very_old_log.id).first() is None
+        assert db.get(OAuthConsentLog, very_old_log.id) is None
         
         # Verify recent log is preserved
-        assert db.query(OAuthConsentLog).filter(OAuthConsentLog.id == recent_log.id).first() is not None
+        assert db.get(OAuthConsentLog, recent_log.id) is not None
         
         # Verify old log is preserved (most recent for user1/google)
-        assert db.query(OAuthConsentLog).filter(OAuthConsentLog.id == old_log.id).first() is not None
+        assert db.get(OAuthConsentLog, old_log.id) is not None
         
         # Verify important old log is preserved (most recent for user2/google)
-        assert db.query(OAuthConsentLog).filter(OAuthConsentLog.id == important_old_log.id).first() is not None
+        assert db.get(OAuthConsentLog, important_old_log.id) is not None
+
+    @pytest.mark.sqlite
+    def test_cleanup_expired_consent_logs_single_indexed_delete(self, db: Session):
+        """Test that cleanup is one DELETE whose ranking scans the composite index."""
+        plan = capture_query_plan(
+            db,
+            lambda: OAuthConsentService.cleanup_expired_consent_logs(db, days_to_keep=365),
+            verb="DELETE"
+        )
+        
+        assert "idx_oauth_consent_user_provider_timestamp" in plan
+
+    def test_cleanup_expired_consent_logs_deletes_in_batches(self, db: Session, make_consent_scenario, count_queries):
+        """Test that a large backlog is deleted in batch_size chunks."""
+        make_consent_scenario(
+            users=[{"email": "user@example.com"}],
+            # 25 expired logs plus the most recent decision, which is kept
+            logs=[{"user": 0, "provider": "google", "days_ago": 400 + i} for i in range(26)]
+        )
+        
+        with count_queries() as queries:
+            cleaned_count = OAuthConsentService.cleanup_expired_consent_logs(
+                db, days_to_keep=365, batch_size=10
+            )
+        
+        assert cleaned_count == 25
+        # 10 + 10 + 5; the short last batch ends the loop without an extra DELETE
+        deletes = [s for s in queries.statements if s.lstrip().startswith("DELETE")]
+        assert len(deletes) == 3
+        assert db.execute(select(func.count()).select_from(OAuthConsentLog)).scalar_one() == 1
 
 
 class TestConsentServiceIntegration:
     """Test full consent service integration scenarios."""
-    
-    def test_full_consent_flow_acceptance(self, db: Session):
+
+    def test_full_consent_flow_acceptance(self, db: Session, count_queries):
         """Test complete consent flow when user accepts linking."""
         # Create user
         user = User(
@@ -455,39 +581,44 @@ class TestConsentServiceIntegration:
             password_hash="hashed_password",
             email_verified=True
         )
+        # id is assigned client-side, so a flush is enough to use it
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        db.flush()
         
         # Initially no consent exists
         assert OAuthConsentService.check_existing_consent(db, user.email, "google") is None
         
-        # Record consent acceptance
-        OAuthConsentService.record_consent_decision(
-            db=db,
-            user=user,
-            provider="google",
-            provider_user_id="google_123456",
-            consent_given=True,
-            client_ip="192.168.1.100",
-            user_agent="Test Browser"
-        )
-        
-        # Verify consent is now recorded
-        assert OAuthConsentService.check_existing_consent(db, user.email, "google") is True
-        assert OAuthConsentService.has_active_consent(db, user, "google") is True
+        # Record consent acceptance: one log INSERT, one user UPDATE
+        with count_queries() as queries:
+            OAuthConsentService.record_consent_decision(
+                db=db,
+                user=user,
+                provider="google",
+                provider_user_id="google_123456",
+                consent_given=True,
+                client_ip="192.168.1.100",
+                user_agent="Test Browser"
+            )
+        assert queries.value <= 2
+        
+        # Verify consent is now recorded; the active-consent check reloads
+        # the user's tracking fields at most once
+        with count_queries() as queries:
+            assert OAuthConsentService.check_existing_consent(db, user.email, "google") is True
+            assert OAuthConsentService.has_active_consent(db, user, "google") is True
+        assert queries.value <= 2
         
         # Verify audit trail
-        consent_logs = db.query(OAuthConsentLog).filter(
+        consent_logs = db.execute(select(OAuthConsentLog).where(
             OAuthConsentLog.user_id == user.id,
             OAuthConsentLog.provider == "google"
-        ).all()
+        )).scalars().all()
         
         assert len(consent_logs) == 1
         assert consent_logs[0].consent_given is True
         assert consent_logs[0].client_ip == "192.168.1.100"
-    
-    def test_consent_flow_with_revocation(self, db: Session):
+
+    def test_consent_flow_with_revocation(self, db: Session, count_queries):
         """Test consent flow with subsequent revocation."""
         # Create user and give initial consent
         user = User(
@@ -495,35 +626,68 @@ class TestConsentServiceIntegration:
             password_hash="hashed_password",
             email_verified=True
         )
+        # id is assigned client-side, so a flush is enough to use it
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        db.flush()
         
         # Record initial consent
-        OAuthConsentService.record_consent_decision(
-            db=db,
-            user=user,
-            provider="github",
-            provider_user_id="github_789",
-            consent_given=True,
-            client_ip="192.168.1.200",
-            user_agent="Test Browser"
-        )
+        with count_queries() as queries:
+            OAuthConsentService.record_consent_decision(
+                db=db,
+                user=user,
+                provider="github",
+                provider_user_id="github_789",
+                consent_given=True,
+                client_ip="192.168.1.200",
+                user_agent="Test Browser"
+            )
+        assert queries.value <= 2
         
         assert OAuthConsentService.has_active_consent(db, user, "github") is True
         
-        # Revoke consent
-        revoked = OAuthConsentService.revoke_oauth_consent(db, user, "github")
+        # Revoke consent: one UPDATE for the logs, one for the user
+        with count_queries() as queries:
+            revoked = OAuthConsentService.revoke_oauth_consent(db, user, "github")
         assert revoked is True
+        assert queries.value <= 2
         
-        # Verify consent is no longer active
-        # Note: has_active_consent may still return True from cached data
-        # but check_existing_consent should reflect the revocation
-        consent_logs = db.query(OAuthConsentLog).filter(
+        # Verify consent is no longer active; revocation drops the user's
+        # tracking entry and the session memo, so both lookups hit the logs
+        assert OAuthConsentService.has_active_consent(db, user, "github") is False
+        assert OAuthConsentService.check_existing_consent(db, user.email, "github") is None
+        consent_logs = db.execute(select(OAuthConsentLog).where(
             OAuthConsentLog.user_id == user.id,
             OAuthConsentLog.provider == "github",
             OAuthConsentLog.revoked_at.is_(None)
-        ).all()
+        )).scalars().all()
         
         # Should be no active (non-revoked) consent logs
-        assert len([log for log in consent_logs if log.consent_given]) == 0
\ No newline at end of file
+        assert len([log for log in consent_logs if log.consent_given]) == 0
+
+    def test_repeated_consent_flow_reuses_compiled_statements(self, db: Session, make_consent_scenario, count_queries):
+        """Test that repeating the consent flow compiles no new SQL."""
+        users, _ = make_consent_scenario(
+            users=[{"email": "first@example.com"}, {"email": "second@example.com"}]
+        )
+        
+        def consent_flow(user):
+            OAuthConsentService.record_consent_decision(
+                db=db,
+                user=user,
+                provider="google",
+                provider_user_id="google_123456",
+                consent_given=True,
+                client_ip="192.168.1.100",
+                user_agent="Test Browser"
+            )
+            OAuthConsentService.check_existing_consent(db, user.email, "google")
+            OAuthConsentService.revoke_oauth_consent(db, user, "google")
+            OAuthConsentService.cleanup_expired_consent_logs(db, days_to_keep=365)
+        
+        # Warm the engine's compiled cache, then run the same flow again
+        consent_flow(db.merge(users[0]))
+        with count_queries() as queries:
+            consent_flow(db.merge(users[1]))
+        
+        assert queries.value > 0
+        assert queries.cached == queries.value
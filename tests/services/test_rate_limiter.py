@@ -1,224 +1,346 @@
 """Tests for Redis-based rate limiting system."""
 
+import fakeredis
 import pytest
 import time
-from unittest.mock import Mock, patch
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from ipaddress import IPv4Address
+from types import SimpleNamespace
+from unittest.mock import Mock
 from fastapi import Request
-from fastapi.testclient import TestClient
 
 from api.rate_limiter import RateLimiter, RateLimitType, RateLimitError, get_client_ip
-from api.config import reload_security_config
+from api.config import get_security_config
+
+
+# Pure unit tests: no database or app fixtures, and no state shared across
+# processes, so the module is safe to spread over pytest-xdist workers
+pytestmark = pytest.mark.unit
+
+# (limit type, RateLimiter attribute holding its request limit, limit to set)
+STRICT_LIMIT_CASES = [
+    (RateLimitType.AUTH, "auth_requests", 2),
+    (RateLimitType.OAUTH, "oauth_requests", 1),
+    (RateLimitType.EMAIL, "email_requests", 1),
+]
+
+# A full /24 of client addresses for bulk identifier tests
+IPV4_ADDRESSES = [IPv4Address(f"10.0.0.{i}") for i in range(256)]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _fast_redis():
+    """
+    Makes every RateLimiter built in this module fail its Redis ping at once.
+    
+    Without Redis running, a real connection attempt can wait for the socket
+    timeout; this sends construction straight to the in-memory fallback.
+    Tests that need a working Redis patch api.rate_limiter.redis.Redis
+    themselves, which takes precedence while they run.
+    """
+    redis_class = Mock()
+    redis_class.return_value.ping.side_effect = ConnectionError("Redis disabled in tests")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr("api.rate_limiter.redis.Redis", redis_class)
+        yield
+
+
+@pytest.fixture(scope="module")
+def base_rate_limiter():
+    """
+    Builds one in-memory RateLimiter for the whole module.
+    
+    Construction re-reads the security config and attempts a Redis
+    connection, so it is done once; tests get it through the rl fixture.
+    """
+    rate_limiter = RateLimiter()
+    rate_limiter.redis_client = None  # Force in-memory mode
+    return rate_limiter
+
+
+@pytest.fixture
+def rl(base_rate_limiter):
+    """
+    Provides the shared rate limiter with empty stores for one test.
+    
+    Tests may change limits and flags freely; every attribute is restored
+    after the test so the next one starts from the loaded configuration.
+    """
+    snapshot = dict(vars(base_rate_limiter))
+    base_rate_limiter._memory_store = {}
+    base_rate_limiter._violation_store = {}
+    yield base_rate_limiter
+    vars(base_rate_limiter).clear()
+    vars(base_rate_limiter).update(snapshot)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    Freezes the rate limiter's clock; advance it with clock.advance(seconds=...).
+    
+    Window expiry can then be tested deterministically instead of waiting on
+    (or working around) the wall clock.
+    """
+    frozen = SimpleNamespace(now=datetime(2024, 1, 1, tzinfo=timezone.utc))
+    
+    def advance(**delta):
+        frozen.now += timedelta(**delta)
+    
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return frozen.now
+    
+    frozen.advance = advance
+    monkeypatch.setattr("api.rate_limiter.datetime", FrozenDatetime)
+    return frozen
 
 
 class TestRateLimiter:
     """Test rate limiting functionality."""
 
+    @pytest.mark.slow
     def test_rate_limiter_initialization(self):
         """Test rate limiter initializes correctly."""
         rate_limiter = RateLimiter()
-        assert rate_limiter is not None
-        assert hasattr(rate_limiter, "enabled")
-        assert hasattr(rate_limiter, "redis_client")
+        assert isinstance(rate_limiter.enabled, bool)
+        assert rate_limiter.redis_client is None or hasattr(rate_limiter.redis_client, "ping")
 
-    def test_rate_limit_config_loading(self):
+    @pytest.mark.slow
+    def test_rate_limit_config_loading(self, monkeypatch):
         """Test rate limit configuration loading."""
-        with patch.dict("os.environ", {
-            "RATE_LIMIT_ENABLED": "true",
-            "RATE_LIMIT_AUTH_REQUESTS": "10",
-            "RATE_LIMIT_AUTH_WINDOW_MINUTES": "5",
-            "RATE_LIMIT_OAUTH_REQUESTS": "25",
-            "RATE_LIMIT_OAUTH_WINDOW_MINUTES": "2"
-        }):
-            # Reload security configuration to pick up environment changes
-            reload_security_config()
-            rate_limiter = RateLimiter()
-            assert rate_limiter.enabled is True
-            assert rate_limiter.auth_requests == 10
-            assert rate_limiter.auth_window_minutes == 5
-            assert rate_limiter.oauth_requests == 25
-            assert rate_limiter.oauth_window_minutes == 2
-        
-        # Cleanup: Reload configuration to restore defaults after test
-        reload_security_config()
-
-    def test_get_rate_limit_config(self):
-        """Test getting rate limit configuration for different types."""
-        rate_limiter = RateLimiter()
+        # Hand RateLimiter a config directly instead of reloading it from env
+        rate_config = replace(
+            get_security_config().rate_limiting,
+            enabled=True,
+            auth_requests=10,
+            auth_window_minutes=5,
+            oauth_requests=25,
+            oauth_window_minutes=2,
+        )
+        monkeypatch.setattr(
+            "api.rate_limiter.get_security_config",
+            lambda: SimpleNamespace(rate_limiting=rate_config),
+        )
         
+        rate_limiter = RateLimiter()
+        assert rate_limiter.enabled is True
+        assert rate_limiter.auth_requests == 10
+        assert rate_limiter.auth_window_minutes == 5
+        assert rate_limiter.oauth_requests == 25
+        assert rate_limiter.oauth_window_minutes == 2
+
+    def test_get_rate_limit_config(self, rl):
+        """Test getting rate limit configuration for different types."""
         # Test AUTH limits
-        max_requests, window_minutes = rate_limiter._get_rate_limit_config(RateLimitType.AUTH)
-        assert max_requests == rate_limiter.auth_requests
-        assert window_minutes == rate_limiter.auth_window_minutes
+        max_requests, window_minutes = rl._get_rate_limit_config(RateLimitType.AUTH)
+        assert max_requests == rl.auth_requests
+        assert window_minutes == rl.auth_window_minutes
         
         # Test OAUTH limits
-        max_requests, window_minutes = rate_limiter._get_rate_limit_config(RateLimitType.OAUTH)
-        assert max_requests == rate_limiter.oauth_requests
-        assert window_minutes == rate_limiter.oauth_window_minutes
+        max_requests, window_minutes = rl._get_rate_limit_config(RateLimitType.OAUTH)
+        assert max_requests == rl.oauth_requests
+        assert window_minutes == rl.oauth_window_minutes
         
         # Test EMAIL limits
-        max_requests, window_minutes = rate_limiter._get_rate_limit_config(RateLimitType.EMAIL)
-        assert max_requests == rate_limiter.email_requests
-        assert window_minutes == rate_limiter.email_window_minutes
+        max_requests, window_minutes = rl._get_rate_limit_config(RateLimitType.EMAIL)
+        assert max_requests == rl.email_requests
+        assert window_minutes == rl.email_window_minutes
 
-    def test_memory_rate_limiting(self):
-        """Test in-memory rate limiting when Redis is unavailable."""
-        rate_limiter = RateLimiter()
-        rate_limiter.redis_client = None  # Force in-memory mode
-        rate_limiter.enabled = True  # Override disabled setting from .env
-        
-        # Configure strict limits for testing
-        rate_limiter.auth_requests = 2
-        rate_limiter.auth_window_minutes = 1
+    @pytest.mark.parametrize("limit_type,attr,n", STRICT_LIMIT_CASES, ids=["auth", "oauth", "email"])
+    def test_strict_limit(self, rl, limit_type, attr, n):
+        """Test that a type's limit is enforced in memory, independently and resettably."""
+        rl.enabled = True  # Override disabled setting from .env
+        setattr(rl, attr, n)
         
         identifier = "test_ip_123.123.123.123"
         
-        # First request should succeed
-        rate_limiter.check_rate_limit(identifier, RateLimitType.AUTH)
+        # The first n requests succeed
+        for _ in range(n):
+            rl.check_rate_limit(identifier, limit_type)
         
-        # Second request should succeed
-        rate_limiter.check_rate_limit(identifier, RateLimitType.AUTH)
-        
-        # Third request should fail
+        # The next one fails
         with pytest.raises(RateLimitError) as exc_info:
-            rate_limiter.check_rate_limit(identifier, RateLimitType.AUTH)
+            rl.check_rate_limit(identifier, limit_type)
         
         assert "Rate limit exceeded" in str(exc_info.value.detail)
         assert exc_info.value.status_code == 429
-
-    def test_rate_limit_disabled(self):
-        """Test that rate limiting can be disabled."""
-        rate_limiter = RateLimiter()
-        rate_limiter.enabled = False
         
-        identifier = "test_ip_disabled"
+        # Other limit types are tracked independently
+        for other_type in {RateLimitType.AUTH, RateLimitType.OAUTH, RateLimitType.EMAIL} - {limit_type}:
+            rl.check_rate_limit(identifier, other_type)
         
-        # Should allow unlimited requests when disabled
-        for _ in range(100):
-            rate_limiter.check_rate_limit(identifier, RateLimitType.AUTH)
+        # Resetting clears the limit and the violation history
+        rl.reset_rate_limit(identifier, limit_type)
+        rl.check_rate_limit(identifier, limit_type)
 
-    def test_rate_limit_reset(self):
-        """Test rate limit reset functionality."""
-        rate_limiter = RateLimiter()
-        rate_limiter.redis_client = None  # Force in-memory mode
-        rate_limiter.enabled = True  # Override disabled setting from .env
+    def test_rate_limit_window_expiry(self, rl, clock):
+        """Test that requests older than the window stop counting."""
+        rl.enabled = True  # Override disabled setting from .env
+        rl.auth_requests = 1
+        rl.auth_window_minutes = 1
         
-        # Configure strict limits
-        rate_limiter.auth_requests = 1
-        rate_limiter.auth_window_minutes = 10  # Long window
+        identifier = "test_ip_expiry"
         
-        identifier = "test_ip_reset"
+        rl.check_rate_limit(identifier, RateLimitType.AUTH)
+        assert rl.get_rate_limit_status(identifier, RateLimitType.AUTH)["current_requests"] == 1
         
-        # Use up the rate limit
-        rate_limiter.check_rate_limit(identifier, RateLimitType.AUTH)
+        # Once the window has passed the slot is free again without a reset
+        clock.advance(seconds=61)
+        assert rl.get_rate_limit_status(identifier, RateLimitType.AUTH)["current_requests"] == 0
+        rl.check_rate_limit(identifier, RateLimitType.AUTH)
         
-        # Should be rate limited
+        # The new request starts a fresh window
         with pytest.raises(RateLimitError):
-            rate_limiter.check_rate_limit(identifier, RateLimitType.AUTH)
-        
-        # Reset the rate limit
-        rate_limiter.reset_rate_limit(identifier, RateLimitType.AUTH)
-        
-        # Should work again
-        rate_limiter.check_rate_limit(identifier, RateLimitType.AUTH)
+            rl.check_rate_limit(identifier, RateLimitType.AUTH)
 
-    def test_different_limit_types_independent(self):
-        """Test that different rate limit types are independent."""
-        rate_limiter = RateLimiter()
-        rate_limiter.redis_client = None  # Force in-memory mode
-        rate_limiter.enabled = True  # Override disabled setting from .env
-        
-        # Configure strict limits
-        rate_limiter.auth_requests = 1
-        rate_limiter.oauth_requests = 1
-        rate_limiter.email_requests = 1
-        
-        identifier = "test_ip_independent"
+    def test_rate_limit_disabled(self, rl):
+        """Test that rate limiting can be disabled."""
+        rl.enabled = False
+        rl.auth_requests = 1
         
-        # Use up AUTH limit
-        rate_limiter.check_rate_limit(identifier, RateLimitType.AUTH)
-        with pytest.raises(RateLimitError):
-            rate_limiter.check_rate_limit(identifier, RateLimitType.AUTH)
+        identifier = "test_ip_disabled"
         
-        # OAUTH should still work
-        rate_limiter.check_rate_limit(identifier, RateLimitType.OAUTH)
+        # Going over the limit is allowed when disabled
+        rl.check_rate_limit(identifier, RateLimitType.AUTH)
+        rl.check_rate_limit(identifier, RateLimitType.AUTH)
         
-        # EMAIL should still work
-        rate_limiter.check_rate_limit(identifier, RateLimitType.EMAIL)
+        # The check short-circuits before recording anything
+        assert rl.enabled is False
+        assert rl._memory_store == {}
 
-    def test_get_rate_limit_status(self):
+    def test_get_rate_limit_status(self, rl):
         """Test getting rate limit status for debugging."""
-        rate_limiter = RateLimiter()
-        rate_limiter.redis_client = None  # Force in-memory mode
-        rate_limiter.enabled = True  # Override disabled setting from .env
+        rl.enabled = True  # Override disabled setting from .env
         
         identifier = "test_ip_status"
         
         # Check initial status
-        status = rate_limiter.get_rate_limit_status(identifier, RateLimitType.AUTH)
+        status = rl.get_rate_limit_status(identifier, RateLimitType.AUTH)
         assert status["current_requests"] == 0
-        assert status["max_requests"] == rate_limiter.auth_requests
-        assert status["window_minutes"] == rate_limiter.auth_window_minutes
+        assert status["max_requests"] == rl.auth_requests
+        assert status["window_minutes"] == rl.auth_window_minutes
         
         # Make a request
-        rate_limiter.check_rate_limit(identifier, RateLimitType.AUTH)
+        rl.check_rate_limit(identifier, RateLimitType.AUTH)
         
         # Check updated status
-        status = rate_limiter.get_rate_limit_status(identifier, RateLimitType.AUTH)
+        status = rl.get_rate_limit_status(identifier, RateLimitType.AUTH)
         assert status["current_requests"] == 1
 
+    def test_auth_endpoint_rate_limiting(self):
+        """Test that authentication endpoints have rate limiting."""
+        # Import check only; the app and database fixtures are not needed
+        from api.routers.auth import rate_limiter
+        assert rate_limiter is not None
+
+    @pytest.mark.parametrize("to_identifier", [str, int], ids=["str", "int"])
+    def test_bulk_identifiers_str_and_int(self, rl, to_identifier):
+        """Test that IPv4 identifiers behave the same as strings or packed ints."""
+        rl.enabled = True  # Override disabled setting from .env
+        rl.auth_requests = 1
+        identifiers = [to_identifier(address) for address in IPV4_ADDRESSES]
+        
+        for identifier in identifiers:
+            rl.check_rate_limit(identifier, RateLimitType.AUTH)
+        
+        # One history per address, and each address is limited independently
+        assert len(rl._memory_store) == len(IPV4_ADDRESSES)
+        for identifier in identifiers:
+            with pytest.raises(RateLimitError):
+                rl.check_rate_limit(identifier, RateLimitType.AUTH)
+
+    @pytest.mark.performance
+    def test_check_rate_limit_memory_throughput(self, rl):
+        """Test that in-memory check cost does not grow with the number of stored keys."""
+        rl.enabled = True  # Override disabled setting from .env
+        rl.auth_requests = 10_000_000  # Never trip the limit while measuring
+        iterations = 10_000
+        
+        def mean_check_seconds(identifiers):
+            # Warm the store so every key already has a request history
+            for identifier in identifiers:
+                rl.check_rate_limit(identifier, RateLimitType.AUTH)
+            start_time = time.perf_counter()
+            for i in range(iterations):
+                rl.check_rate_limit(identifiers[i % len(identifiers)], RateLimitType.AUTH)
+            return (time.perf_counter() - start_time) / iterations
+        
+        small = mean_check_seconds([f"test_ip_small_{i}" for i in range(100)])
+        large = mean_check_seconds([f"test_ip_large_{i}" for i in range(10_000)])
+        
+        # Compare against the same process rather than a wall-clock budget, so
+        # xdist or a loaded CI host slows both sides alike. A check that
+        # scanned the whole store would be ~100x slower on the large one.
+        assert large < small * 5, (
+            f"{small * 1e6:.1f}µs per check with 100 keys, "
+            f"{large * 1e6:.1f}µs with 10,100 keys"
+        )
+
 
 class TestClientIPExtraction:
     """Test client IP extraction functionality."""
 
-    def test_get_client_ip_direct(self):
+    @pytest.fixture(scope="class")
+    def make_request(self):
+        """
+        Returns a factory for mock requests with the given headers and client host.
+        
+        Mock(spec=Request) introspects the whole Request class, so the spec'd
+        mock is built once per class and only its headers and client are
+        replaced on each call.
+        """
+        request = Mock(spec=Request)
+        
+        def build(headers, host):
+            request.headers = headers
+            if host is None:
+                request.client = None
+            else:
+                request.client = Mock()
+                request.client.host = host
+            return request
+        
+        return build
+
+    def test_get_client_ip_direct(self, make_request):
         """Test getting client IP from direct connection."""
         # Mock request with direct client
-        request = Mock(spec=Request)
-        request.headers = {}
-        request.client = Mock()
-        request.client.host = "192.168.1.100"
+        request = make_request({}, "192.168.1.100")
         
         ip = get_client_ip(request)
         assert ip == "192.168.1.100"
 
-    def test_get_client_ip_forwarded_for(self):
+    def test_get_client_ip_forwarded_for(self, make_request):
         """Test getting client IP from X-Forwarded-For header."""
-        request = Mock(spec=Request)
-        request.headers = {"X-Forwarded-For": "203.0.113.10, 192.168.1.1"}
-        request.client = Mock()
-        request.client.host = "192.168.1.1"
+        request = make_request({"X-Forwarded-For": "203.0.113.10, 192.168.1.1"}, "192.168.1.1")
         
         ip = get_client_ip(request)
         assert ip == "203.0.113.10"
 
-    def test_get_client_ip_real_ip(self):
+    def test_get_client_ip_real_ip(self, make_request):
         """Test getting client IP from X-Real-IP header."""
-        request = Mock(spec=Request)
-        request.headers = {"X-Real-IP": "203.0.113.20"}
-        request.client = Mock()
-        request.client.host = "192.168.1.1"
+        request = make_request({"X-Real-IP": "203.0.113.20"}, "192.168.1.1")
         
         ip = get_client_ip(request)
         assert ip == "203.0.113.20"
 
-    def test_get_client_ip_no_client(self):
+    def test_get_client_ip_no_client(self, make_request):
         """Test getting client IP when client is None."""
-        request = Mock(spec=Request)
-        request.headers = {}
-        request.client = None
+        request = make_request({}, None)
         
         ip = get_client_ip(request)
         assert ip == "unknown"
 
-    def test_get_client_ip_priority(self):
+    def test_get_client_ip_priority(self, make_request):
         """Test that X-Forwarded-For takes priority over X-Real-IP."""
-        request = Mock(spec=Request)
-        request.headers = {
+        request = make_request({
             "X-Forwarded-For": "203.0.113.30",
             "X-Real-IP": "203.0.113.40"
-        }
-        request.client = Mock()
-        request.client.host = "192.168.1.1"
+        }, "192.168.1.1")
         
         ip = get_client_ip(request)
         assert ip == "203.0.113.30"
@@ -227,99 +349,104 @@ class TestClientIPExtraction:
 class TestRateLimitError:
     """Test rate limit error handling."""
 
-    def test_rate_limit_error_creation(self):
-        """Test creating rate limit error."""
-        error = RateLimitError("Test message", retry_after=120)
-        
-        assert error.status_code == 429
-        assert error.detail == "Test message"
-        assert error.headers == {"Retry-After": "120"}
-
-    def test_rate_limit_error_default_retry_after(self):
-        """Test rate limit error with default retry after."""
-        error = RateLimitError("Test message")
+    @pytest.mark.parametrize("retry_after,expected", [
+        (120, "120"),
+        (None, "60"),
+        (300, "300"),
+    ], ids=["explicit", "default", "long"])
+    def test_rate_limit_error(self, retry_after, expected):
+        """Test rate limit error status, message, and Retry-After header."""
+        kwargs = {} if retry_after is None else {"retry_after": retry_after}
+        error = RateLimitError("Test message", **kwargs)
         
         assert error.status_code == 429
         assert error.detail == "Test message"
-        assert error.headers == {"Retry-After": "60"}
+        assert error.headers == {"Retry-After": expected}
 
 
 class TestRedisIntegration:
-    """Test Redis integration functionality."""
+    """Test Redis integration functionality against an in-process fake Redis."""
+
+    @pytest.fixture
+    def redis_rl(self, monkeypatch):
+        """
+        Builds a RateLimiter connected to fakeredis, with limiting enabled.
+        
+        fakeredis runs the real sorted-set commands, so the sliding window
+        code path is exercised end to end without a Redis server.
+        """
+        monkeypatch.setattr("api.rate_limiter.redis.Redis", fakeredis.FakeRedis)
+        rate_limiter = RateLimiter()
+        # FakeRedis instances share data per host/port; start every test empty
+        rate_limiter.redis_client.flushall()
+        rate_limiter.enabled = True  # Override disabled setting from .env
+        return rate_limiter
 
-    @patch("api.rate_limiter.redis.Redis")
-    def test_redis_connection_success(self, mock_redis_class):
+    def test_redis_connection_success(self, redis_rl):
         """Test successful Redis connection."""
-        mock_redis_instance = Mock()
-        mock_redis_instance.ping.return_value = True
-        mock_redis_class.return_value = mock_redis_instance
-        
-        with patch.dict("os.environ", {
-            "REDIS_HOST": "localhost",
-            "REDIS_PORT": "6379",
-            "REDIS_DB": "0"
-        }):
-            rate_limiter = RateLimiter()
-            assert rate_limiter.redis_client is not None
-
-    @patch("api.rate_limiter.redis.Redis")
-    def test_redis_connection_failure(self, mock_redis_class):
+        assert redis_rl.redis_client is not None
+        assert redis_rl.redis_client.ping() is True
+
+    def test_redis_connection_failure(self, monkeypatch):
         """Test Redis connection failure fallback."""
-        mock_redis_instance = Mock()
-        mock_redis_instance.ping.side_effect = Exception("Connection failed")
-        mock_redis_class.return_value = mock_redis_instance
+        server = fakeredis.FakeServer()
+        server.connected = False
+        monkeypatch.setattr(
+            "api.rate_limiter.redis.Redis", partial(fakeredis.FakeRedis, server=server)
+        )
         
         rate_limiter = RateLimiter()
         assert rate_limiter.redis_client is None
 
-    @patch("api.rate_limiter.redis.Redis")
-    def test_redis_rate_limiting_fallback(self, mock_redis_class):
+    def test_redis_rate_limiting_fallback(self, redis_rl, monkeypatch):
         """Test fallback to memory when Redis operations fail."""
-        mock_redis_instance = Mock()
-        mock_redis_instance.ping.return_value = True
-        mock_redis_instance.pipeline.side_effect = Exception("Redis error")
-        mock_redis_class.return_value = mock_redis_instance
-        
-        rate_limiter = RateLimiter()
-        rate_limiter.enabled = True  # Override disabled setting from .env
-        rate_limiter.auth_requests = 1  # Strict limit for testing
+        monkeypatch.setattr(
+            redis_rl.redis_client, "pipeline", Mock(side_effect=Exception("Redis error"))
+        )
+        redis_rl.auth_requests = 1  # Strict limit for testing
         
         identifier = "test_ip_fallback"
         
         # First request should succeed (falls back to memory)
-        rate_limiter.check_rate_limit(identifier, RateLimitType.AUTH)
+        redis_rl.check_rate_limit(identifier, RateLimitType.AUTH)
         
         # Second request should fail (memory rate limiting kicks in)
         with pytest.raises(RateLimitError):
-            rate_limiter.check_rate_limit(identifier, RateLimitType.AUTH)
+            redis_rl.check_rate_limit(identifier, RateLimitType.AUTH)
+        assert redis_rl._memory_store
+
+    def test_redis_sliding_window_counts_with_zcard(self, redis_rl, monkeypatch):
+        """Test that requests under the limit are counted without reading the log."""
+        client = redis_rl.redis_client
+        zrange = Mock(wraps=client.zrange)
+        monkeypatch.setattr(client, "zrange", zrange)
+        redis_rl.auth_requests = 3
+        key = "rate_limit:auth:test_ip_zcard"
+        
+        for expected in range(1, 4):
+            redis_rl.check_rate_limit("test_ip_zcard", RateLimitType.AUTH)
+            assert client.zcard(key) == expected
+        
+        # Allowed requests only need ZCARD; the log is read once, for Retry-After
+        zrange.assert_not_called()
+        with pytest.raises(RateLimitError) as exc_info:
+            redis_rl.check_rate_limit("test_ip_zcard", RateLimitType.AUTH)
+        zrange.assert_called_once()
+        
+        retry_after = int(exc_info.value.headers["Retry-After"])
+        assert 0 < retry_after <= redis_rl.auth_window_minutes * 60 + 1
+        assert redis_rl._memory_store == {}
 
 
 @pytest.mark.integration
 class TestRateLimitingIntegration:
     """Integration tests for rate limiting with FastAPI endpoints."""
 
-    def test_auth_endpoint_rate_limiting(self, client, db):
-        """Test that authentication endpoints have rate limiting."""
-        # This test would require the full FastAPI app setup
-        # For now, we'll test that the rate limiter is properly imported
-        from api.routers.auth import rate_limiter
-        assert rate_limiter is not None
-
-    def test_rate_limit_headers_in_response(self):
-        """Test that rate limit errors include proper headers."""
-        error = RateLimitError("Too many requests", retry_after=300)
-        
-        assert error.status_code == 429
-        assert "Retry-After" in error.headers
-        assert error.headers["Retry-After"] == "300"
-
-    def test_different_endpoints_different_limits(self):
+    def test_different_endpoints_different_limits(self, rl):
         """Test that different endpoints can have different rate limits."""
-        rate_limiter = RateLimiter()
-        
         # AUTH and EMAIL should have different limits
-        auth_config = rate_limiter._get_rate_limit_config(RateLimitType.AUTH)
-        email_config = rate_limiter._get_rate_limit_config(RateLimitType.EMAIL)
+        auth_config = rl._get_rate_limit_config(RateLimitType.AUTH)
+        email_config = rl._get_rate_limit_config(RateLimitType.EMAIL)
         
         # Default config should have AUTH less strict than EMAIL
         assert auth_config[0] > email_config[0]  # AUTH allows more requests
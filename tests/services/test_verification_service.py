@@ -11,8 +11,12 @@ Tests for the unified verification code system that handles:
 This ensures consistent security, rate limiting, and audit trails across all verification types.
 """
 
+import itertools
 import pytest
+import random
 from datetime import datetime, timezone, timedelta
+from types import SimpleNamespace
+from sqlalchemy import func, insert, select, update
 from sqlalchemy.orm import Session
 import uuid
 
@@ -22,24 +26,153 @@ from api.verification_service import (
     VerificationType,
 )
 
+# (verification type, expected expiry in minutes, expected max attempts)
+TYPE_CONFIGS = (
+    (VerificationType.EMAIL_VERIFICATION, 15, 3),
+    (VerificationType.TWO_FACTOR_AUTH, 5, 3),
+    (VerificationType.PASSWORD_RESET, 30, 5),
+    (VerificationType.PASSWORD_CHANGE, 15, 3),
+    (VerificationType.EMAIL_CHANGE, 15, 3),
+    (VerificationType.ACCOUNT_RECOVERY, 60, 3),
+    (VerificationType.SENSITIVE_ACTION, 10, 2),
+)
+
+# Counter-based user ids: unique within a run without an OS entropy read per
+# id. The "face" prefix keeps a letter in the hex; SQLite gives UUID columns
+# NUMERIC affinity and would store an all-digit hex string as an integer
+_UID_PREFIX = 0xFACE << 112
+_uid_counter = itertools.count(1)
+
+
+def _fresh_uid():
+    """Return a run-unique user id."""
+    return uuid.UUID(int=_UID_PREFIX | next(_uid_counter))
+
+
+def _as_naive_utc(dt):
+    """Express a datetime as naive UTC, the form SQLite hands back."""
+    return dt.astimezone(timezone.utc).replace(tzinfo=None) if dt.tzinfo else dt
+
+
+@pytest.fixture(scope="module")
+def bulk_codes():
+    """
+    Generates 2000 verification codes once for the pure-generation tests.
+    
+    Codes are stateless and those tests only check format and statistical
+    properties, so each slices its own sample from this shared list. The
+    sample is drawn from a seeded PRNG standing in for the secrets module,
+    which keeps the statistical assertions reproducible and skips one
+    urandom read per code.
+    """
+    rng = random.Random(0)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(
+            "api.verification_service.secrets",
+            SimpleNamespace(randbelow=rng.randrange, choice=rng.choice),
+        )
+        return VerificationCodeService.generate_codes(2000)
+
+
+
+@pytest.fixture
+def email_code(db: Session):
+    """
+    Inserts one active email verification code for a fresh user.
+    
+    The validation tests only exercise verify_code(), so the code is written
+    directly instead of going through create_verification_code() and its
+    rate limit, uniqueness and invalidation queries.
+    """
+    now = datetime.now(timezone.utc)
+    user_id = _fresh_uid()
+    code = VerificationCodeService.generate_code()
+    db.execute(insert(VerificationCode), [{
+        "user_id": user_id,
+        "verification_type": VerificationType.EMAIL_VERIFICATION,
+        "code": code,
+        "expires_at": now + timedelta(minutes=15),
+        "max_attempts": 3,
+        "attempts": 0,
+        "is_used": False,
+        "created_at": now,
+    }])
+    return SimpleNamespace(user_id=user_id, code=code)
+
+
+@pytest.fixture
+def two_user_codes(db: Session):
+    """Creates an email verification code for each of two fresh users."""
+    user1_id, user2_id = _fresh_uid(), _fresh_uid()
+    code1, _ = VerificationCodeService.create_verification_code(
+        db=db, user_id=user1_id, verification_type=VerificationType.EMAIL_VERIFICATION
+    )
+    code2, _ = VerificationCodeService.create_verification_code(
+        db=db, user_id=user2_id, verification_type=VerificationType.EMAIL_VERIFICATION
+    )
+    return SimpleNamespace(user1_id=user1_id, code1=code1, user2_id=user2_id, code2=code2)
+
+
+@pytest.fixture
+def two_type_codes(db: Session):
+    """Creates an email verification and a password reset code for one user."""
+    user_id = _fresh_uid()
+    email_code, _ = VerificationCodeService.create_verification_code(
+        db=db, user_id=user_id, verification_type=VerificationType.EMAIL_VERIFICATION
+    )
+    reset_code, _ = VerificationCodeService.create_verification_code(
+        db=db, user_id=user_id, verification_type=VerificationType.PASSWORD_RESET
+    )
+    return SimpleNamespace(user_id=user_id, email_code=email_code, reset_code=reset_code)
+
+
+def _expire_code(db: Session, email_code):
+    """Moves the code's expiry into the past."""
+    db.execute(
+        update(VerificationCode)
+        .where(VerificationCode.user_id == email_code.user_id)
+        .values(expires_at=datetime.now(timezone.utc) - timedelta(minutes=1))
+    )
+
+
+def _use_code(db: Session, email_code):
+    """Spends the code with one successful verification."""
+    result = VerificationCodeService.verify_code(
+        db=db, user_id=email_code.user_id, code=email_code.code,
+        verification_type=VerificationType.EMAIL_VERIFICATION
+    )
+    assert result["valid"] is True
+
+
+def _exhaust_attempts(db: Session, email_code):
+    """Uses up the code's attempts, the last one with a wrong guess."""
+    # Jump straight to the final attempt, then let one wrong guess lock it out
+    db.execute(
+        update(VerificationCode)
+        .where(VerificationCode.user_id == email_code.user_id)
+        .values(attempts=VerificationCode.max_attempts - 1)
+    )
+    result = VerificationCodeService.verify_code(
+        db=db, user_id=email_code.user_id, code="000000",
+        verification_type=VerificationType.EMAIL_VERIFICATION
+    )
+    assert result["valid"] is False
+    assert result["attempts_remaining"] == 0
+
 
 class TestVerificationCodeGeneration:
     """Test verification code generation."""
 
-    def test_generate_code_returns_six_digits(self):
+    def test_generate_code_returns_six_digits(self, bulk_codes):
         """Test that generated codes are always 6 digits."""
-        for _ in range(100):  # Test multiple generations
-            code = VerificationCodeService.generate_code()
+        for code in bulk_codes[:100]:  # Test multiple generations
             assert len(code) == 6
             assert code.isdigit()
             assert 100000 <= int(code) <= 999999
 
-    def test_generate_code_uniqueness(self):
+    def test_generate_code_uniqueness(self, bulk_codes):
         """Test that generated codes are unique (at least mostly)."""
-        codes = set()
-        for _ in range(1000):
-            code = VerificationCodeService.generate_code()
-            codes.add(code)
+        codes = set(bulk_codes[100:1100])
         
         # With 900,000 possible codes, we should have good uniqueness
         # Allow for some collisions but ensure reasonable distribution
@@ -49,9 +182,9 @@ class TestVerificationCodeGeneration:
 class TestVerificationCodeCreation:
     """Test verification code creation and database operations."""
 
-    def test_create_verification_code_email_type(self, db: Session, mailpit_disabled):
+    def test_create_verification_code_email_type(self, db: Session):
         """Test creating an email verification code."""
-        user_id = uuid.uuid4()
+        user_id = _fresh_uid()
         
         code, expires_at = VerificationCodeService.create_verification_code(
             db=db, user_id=user_id, verification_type=VerificationType.EMAIL_VERIFICATION
@@ -70,55 +203,44 @@ class TestVerificationCodeCreation:
         
         assert db_code is not None
         assert db_code.code == code
-        # Handle timezone differences between SQLite (tests) and PostgreSQL (production)
-        if db_code.expires_at.tzinfo is None and expires_at.tzinfo is not None:
-            # SQLite stripped timezone info, compare by replacing timezone
-            assert db_code.expires_at == expires_at.replace(tzinfo=None)
-        else:
-            assert db_code.expires_at == expires_at
+        # SQLite (tests) drops the timezone that PostgreSQL (production) keeps
+        assert _as_naive_utc(db_code.expires_at) == _as_naive_utc(expires_at)
         assert db_code.max_attempts == 3  # Email verification config
         assert db_code.attempts == 0
         assert db_code.is_used is False
         assert db_code.used_at is None
 
-    def test_create_verification_code_different_types(self, db: Session, mailpit_disabled):
+    @pytest.mark.parametrize(
+        "verification_type,expiration_minutes,max_attempts",
+        TYPE_CONFIGS,
+        ids=[config[0].value for config in TYPE_CONFIGS],
+    )
+    def test_create_verification_code_different_types(
+        self, db: Session, verification_type, expiration_minutes, max_attempts
+    ):
         """Test creating codes for different verification types."""
-        user_id = uuid.uuid4()
-        
-        # Test each verification type
-        type_configs = {
-            VerificationType.EMAIL_VERIFICATION: {"expiration_minutes": 15, "max_attempts": 3},
-            VerificationType.TWO_FACTOR_AUTH: {"expiration_minutes": 5, "max_attempts": 3},
-            VerificationType.PASSWORD_RESET: {"expiration_minutes": 30, "max_attempts": 5},
-            VerificationType.PASSWORD_CHANGE: {"expiration_minutes": 15, "max_attempts": 3},
-            VerificationType.EMAIL_CHANGE: {"expiration_minutes": 15, "max_attempts": 3},
-            VerificationType.ACCOUNT_RECOVERY: {"expiration_minutes": 60, "max_attempts": 3},
-            VerificationType.SENSITIVE_ACTION: {"expiration_minutes": 10, "max_attempts": 2},
-        }
-        
-        for verification_type, expected_config in type_configs.items():
-            code, expires_at = VerificationCodeService.create_verification_code(
-                db=db, user_id=user_id, verification_type=verification_type
-            )
-            
-            db_code = db.query(VerificationCode).filter(
-                VerificationCode.user_id == user_id,
-                VerificationCode.verification_type == verification_type
-            ).first()
-            
-            assert db_code is not None
-            assert db_code.max_attempts == expected_config["max_attempts"]
-            
-            # Check expiration time (allow 1 minute tolerance for test execution time)
-            expected_expiration = db_code.created_at + timedelta(
-                minutes=expected_config["expiration_minutes"]
-            )
-            time_diff = abs((db_code.expires_at - expected_expiration).total_seconds())
-            assert time_diff < 60  # Within 1 minute
+        user_id = _fresh_uid()
+        
+        code, expires_at = VerificationCodeService.create_verification_code(
+            db=db, user_id=user_id, verification_type=verification_type
+        )
+        
+        db_code = db.query(VerificationCode).filter(
+            VerificationCode.user_id == user_id,
+            VerificationCode.verification_type == verification_type
+        ).first()
+        
+        assert db_code is not None
+        assert db_code.max_attempts == max_attempts
+        
+        # Check expiration time (allow 1 minute tolerance for test execution time)
+        expected_expiration = db_code.created_at + timedelta(minutes=expiration_minutes)
+        time_diff = abs((db_code.expires_at - expected_expiration).total_seconds())
+        assert time_diff < 60  # Within 1 minute
 
-    def test_rate_limiting_prevents_frequent_requests(self, db: Session, mailpit_disabled):
+    def test_rate_limiting_prevents_frequent_requests(self, db: Session):
         """Test that rate limiting prevents too frequent code generation."""
-        user_id = uuid.uuid4()
+        user_id = _fresh_uid()
         
         # First request should succeed
         code1, _ = VerificationCodeService.create_verification_code(
@@ -132,33 +254,29 @@ class TestVerificationCodeCreation:
                 db=db, user_id=user_id, verification_type=VerificationType.EMAIL_VERIFICATION
             )
 
-    def test_hourly_rate_limiting_prevents_abuse(self, db: Session, mailpit_disabled):
+    def test_hourly_rate_limiting_prevents_abuse(self, db: Session):
         """Test that hourly rate limiting prevents too many verification requests."""
-        user_id = uuid.uuid4()
+        user_id = _fresh_uid()
         now = datetime.now(timezone.utc)
         
-        # Manually create 6 verification codes with timestamps spread across the hour
-        # to simulate reaching the hourly limit
-        for i in range(6):  # Create 6 codes (the hourly limit)
-            # Create code manually to avoid rate limiting during test setup
-            code = VerificationCodeService.generate_code()
-            expires_at = now + timedelta(minutes=15)
-            
-            verification_code = VerificationCode(
-                user_id=user_id,
-                verification_type=VerificationType.EMAIL_VERIFICATION,
-                code=code,
-                expires_at=expires_at,
-                max_attempts=3,
-                # Set created_at to be (5 + i * 8) minutes ago to avoid 1-minute rate limit
-                # but still be within the hour for hourly limit checking
-                created_at=now - timedelta(minutes=5 + i * 8),
-                is_used=False,
-                attempts=0
-            )
-            db.add(verification_code)
-        
-        db.commit()
+        # Insert 6 verification codes (the hourly limit) in one statement,
+        # bypassing the service so its rate limiting doesn't block setup.
+        # created_at is (5 + i * 8) minutes ago to avoid the 1-minute rate
+        # limit but still be within the hour for hourly limit checking
+        rows = [
+            {
+                "user_id": user_id,
+                "verification_type": VerificationType.EMAIL_VERIFICATION,
+                "code": VerificationCodeService.generate_code(),
+                "expires_at": now + timedelta(minutes=15),
+                "max_attempts": 3,
+                "created_at": now - timedelta(minutes=5 + i * 8),
+                "is_used": False,
+                "attempts": 0,
+            }
+            for i in range(6)
+        ]
+        db.execute(insert(VerificationCode), rows)
         
         # Now try to create a 7th code - should fail due to hourly limit
         with pytest.raises(ValueError, match="Hourly limit exceeded"):
@@ -166,9 +284,9 @@ class TestVerificationCodeCreation:
                 db=db, user_id=user_id, verification_type=VerificationType.EMAIL_VERIFICATION
             )
 
-    def test_invalidates_existing_codes_on_new_creation(self, db: Session, mailpit_disabled):
+    def test_invalidates_existing_codes_on_new_creation(self, db: Session):
         """Test that creating a new code invalidates existing unused codes."""
-        user_id = uuid.uuid4()
+        user_id = _fresh_uid()
         
         # Create first code
         code1, _ = VerificationCodeService.create_verification_code(
@@ -181,57 +299,42 @@ class TestVerificationCodeCreation:
             VerificationCode.code == code1
         ).first()
         first_code_record.created_at = datetime.now(timezone.utc) - timedelta(minutes=5)
-        db.commit()
+        db.flush()
         
         # Create second code
         code2, _ = VerificationCodeService.create_verification_code(
             db=db, user_id=user_id, verification_type=VerificationType.PASSWORD_RESET
         )
         
-        # First code should be invalidated
-        db.refresh(first_code_record)
+        # First code should be invalidated; reload just the asserted columns
+        db.expire(first_code_record, ["is_used", "used_at"])
         assert first_code_record.is_used is True
         assert first_code_record.used_at is not None
         
-        # Second code should be active
-        second_code_record = db.query(VerificationCode).filter(
-            VerificationCode.user_id == user_id,
-            VerificationCode.code == code2
-        ).first()
-        assert second_code_record.is_used is False
+        # Second code should be active; with the first one used, it is the
+        # only code the status lookup can find
+        status = VerificationCodeService.get_user_code_status(
+            db=db, user_id=user_id, verification_type=VerificationType.PASSWORD_RESET
+        )
+        assert status is not None
+        assert status["has_active_code"] is True
 
-    def test_code_uniqueness_within_active_codes(self, db: Session, mailpit_disabled):
+    def test_code_uniqueness_within_active_codes(self, two_user_codes):
         """Test that codes are unique among active codes of the same type."""
         # This test verifies the uniqueness check in the creation process
         # It's hard to test directly, but we can test that different users
         # get different codes when created at the same time
         
-        user1_id = uuid.uuid4()
-        user2_id = uuid.uuid4()
-        
-        code1, _ = VerificationCodeService.create_verification_code(
-            db=db, user_id=user1_id, verification_type=VerificationType.EMAIL_VERIFICATION
-        )
-        
-        code2, _ = VerificationCodeService.create_verification_code(
-            db=db, user_id=user2_id, verification_type=VerificationType.EMAIL_VERIFICATION
-        )
-        
         # Codes should be different (very high probability)
-        assert code1 != code2
+        assert two_user_codes.code1 != two_user_codes.code2
 
 
 class TestVerificationCodeValidation:
     """Test verification code validation."""
 
-    def test_verify_valid_code(self, db: Session, mailpit_disabled):
+    def test_verify_valid_code(self, db: Session, email_code):
         """Test successful code verification."""
-        user_id = uuid.uuid4()
-        
-        # Create a code
-        code, _ = VerificationCodeService.create_verification_code(
-            db=db, user_id=user_id, verification_type=VerificationType.EMAIL_VERIFICATION
-        )
+        user_id, code = email_code.user_id, email_code.code
         
         # Verify the code
         result = VerificationCodeService.verify_code(
@@ -243,16 +346,14 @@ class TestVerificationCodeValidation:
         assert result["verification_id"] is not None
         assert result["attempts_remaining"] is None
         
-        # Code should be marked as used
-        db_code = db.query(VerificationCode).filter(
-            VerificationCode.id == result["verification_id"]
-        ).first()
+        # Code should be marked as used; look it up by primary key
+        db_code = db.get(VerificationCode, result["verification_id"])
         assert db_code.is_used is True
         assert db_code.used_at is not None
 
-    def test_verify_invalid_code(self, db: Session, mailpit_disabled):
+    def test_verify_invalid_code(self, db: Session):
         """Test verification with invalid code."""
-        user_id = uuid.uuid4()
+        user_id = _fresh_uid()
         
         result = VerificationCodeService.verify_code(
             db=db, user_id=user_id, code="999999", verification_type=VerificationType.EMAIL_VERIFICATION
@@ -263,123 +364,59 @@ class TestVerificationCodeValidation:
         assert result["verification_id"] is None
         assert result["attempts_remaining"] is None
 
-    def test_verify_expired_code(self, db: Session, mailpit_disabled):
-        """Test verification with expired code."""
-        user_id = uuid.uuid4()
-        
-        # Create a code
-        code, _ = VerificationCodeService.create_verification_code(
-            db=db, user_id=user_id, verification_type=VerificationType.EMAIL_VERIFICATION
-        )
+    @pytest.mark.parametrize("spoil_code,expected_message", [
+        (_expire_code, "Verification code has expired"),
+        (_use_code, "Verification code has already been used"),
+        (_exhaust_attempts, "Maximum verification attempts exceeded"),
+    ], ids=["expired", "already_used", "max_attempts"])
+    def test_verify_rejected_code(
+        self, db: Session, email_code, spoil_code, expected_message
+    ):
+        """Test that expired, used and locked-out codes are rejected."""
+        spoil_code(db, email_code)
         
-        # Manually expire the code
-        db_code = db.query(VerificationCode).filter(
-            VerificationCode.user_id == user_id,
-            VerificationCode.code == code
-        ).first()
-        # Handle timezone for SQLite vs PostgreSQL
-        if db_code.expires_at.tzinfo is None:
-            # SQLite - use timezone-naive datetime
-            db_code.expires_at = datetime.now() - timedelta(minutes=1)
-        else:
-            # PostgreSQL - use timezone-aware datetime
-            db_code.expires_at = datetime.now(timezone.utc) - timedelta(minutes=1)
-        db.commit()
-        
-        # Try to verify expired code
         result = VerificationCodeService.verify_code(
-            db=db, user_id=user_id, code=code, verification_type=VerificationType.EMAIL_VERIFICATION
+            db=db, user_id=email_code.user_id, code=email_code.code,
+            verification_type=VerificationType.EMAIL_VERIFICATION
         )
         
         assert result["valid"] is False
-        assert result["message"] == "Verification code has expired"
-
-    def test_verify_already_used_code(self, db: Session, mailpit_disabled):
-        """Test verification with already used code."""
-        user_id = uuid.uuid4()
-        
-        # Create and use a code
-        code, _ = VerificationCodeService.create_verification_code(
-            db=db, user_id=user_id, verification_type=VerificationType.EMAIL_VERIFICATION
-        )
-        
-        # Use the code once
-        result1 = VerificationCodeService.verify_code(
-            db=db, user_id=user_id, code=code, verification_type=VerificationType.EMAIL_VERIFICATION
-        )
-        assert result1["valid"] is True
-        
-        # Try to use it again
-        result2 = VerificationCodeService.verify_code(
-            db=db, user_id=user_id, code=code, verification_type=VerificationType.EMAIL_VERIFICATION
-        )
-        
-        assert result2["valid"] is False
-        assert result2["message"] == "Verification code has already been used"
-
-    def test_verify_max_attempts_exceeded(self, db: Session, mailpit_disabled):
-        """Test verification with too many failed attempts."""
-        user_id = uuid.uuid4()
-        
-        # Create a code
-        code, _ = VerificationCodeService.create_verification_code(
-            db=db, user_id=user_id, verification_type=VerificationType.EMAIL_VERIFICATION
-        )
-        
-        # Make maximum allowed attempts with wrong code
-        for i in range(3):  # Email verification allows 3 attempts
-            result = VerificationCodeService.verify_code(
-                db=db, user_id=user_id, code="000000", verification_type=VerificationType.EMAIL_VERIFICATION
-            )
-            assert result["valid"] is False
-        
-        # Code should still exist but any further attempts should fail
-        result = VerificationCodeService.verify_code(
-            db=db, user_id=user_id, code=code, verification_type=VerificationType.EMAIL_VERIFICATION
-        )
-        
-        assert result["valid"] is False
-        assert result["message"] == "Maximum verification attempts exceeded"
+        assert result["message"] == expected_message
 
 
 class TestVerificationCodeUtilities:
     """Test utility functions for verification codes."""
 
-    def test_cleanup_expired_codes(self, db: Session, mailpit_disabled):
+    def test_cleanup_expired_codes(self, db: Session):
         """Test cleanup of expired and used codes."""
-        user_id = uuid.uuid4()
+        user_id = _fresh_uid()
         
         # Create some codes
         code1, _ = VerificationCodeService.create_verification_code(
             db=db, user_id=user_id, verification_type=VerificationType.EMAIL_VERIFICATION
         )
         
-        # Manually create expired and used codes
-        expired_code = VerificationCode(
-            user_id=user_id,
-            verification_type=VerificationType.EMAIL_VERIFICATION,
-            code="111111",
-            expires_at=datetime.now(timezone.utc) - timedelta(minutes=1),
-            max_attempts=3,
-            is_used=False
-        )
-        
-        used_code = VerificationCode(
-            user_id=user_id,
-            verification_type=VerificationType.EMAIL_VERIFICATION,
-            code="222222",
-            expires_at=datetime.now(timezone.utc) + timedelta(minutes=15),
-            max_attempts=3,
-            is_used=True,
-            used_at=datetime.now(timezone.utc)
-        )
-        
-        db.add(expired_code)
-        db.add(used_code)
-        db.commit()
-        
-        # Count codes before cleanup
-        codes_before = db.query(VerificationCode).count()
+        # Manually insert expired and used codes in one statement
+        now = datetime.now(timezone.utc)
+        db.execute(insert(VerificationCode), [
+            {
+                "user_id": user_id,
+                "verification_type": VerificationType.EMAIL_VERIFICATION,
+                "code": "111111",
+                "expires_at": now - timedelta(minutes=1),
+                "max_attempts": 3,
+                "is_used": False,
+            },
+            {
+                "user_id": user_id,
+                "verification_type": VerificationType.EMAIL_VERIFICATION,
+                "code": "222222",
+                "expires_at": now + timedelta(minutes=15),
+                "max_attempts": 3,
+                "is_used": True,
+                "used_at": now,
+            },
+        ])
         
         # Run cleanup
         cleaned_count = VerificationCodeService.cleanup_expired_codes(db)
@@ -387,28 +424,19 @@ class TestVerificationCodeUtilities:
         # Check results
         assert cleaned_count == 2  # Should clean expired and used codes
         
-        # Active code should remain
-        remaining_codes = db.query(VerificationCode).all()
-        now_utc = datetime.now(timezone.utc)
-        
-        # Handle timezone comparison for SQLite vs PostgreSQL
-        active_codes = []
-        for c in remaining_codes:
-            if not c.is_used:
-                if c.expires_at.tzinfo is None:
-                    # SQLite datetime without timezone, compare with timezone-naive version
-                    if c.expires_at > now_utc.replace(tzinfo=None):
-                        active_codes.append(c)
-                else:
-                    # PostgreSQL datetime with timezone
-                    if c.expires_at > now_utc:
-                        active_codes.append(c)
-        assert len(active_codes) == 1
-        assert active_codes[0].code == code1
-
-    def test_get_user_code_status_with_active_code(self, db: Session, mailpit_disabled):
+        # Only the active code should remain; the database compares expiry
+        # against its own clock, so SQLite and PostgreSQL behave the same
+        active_codes = db.scalars(
+            select(VerificationCode.code).where(
+                VerificationCode.is_used.is_(False),
+                VerificationCode.expires_at > func.current_timestamp(),
+            )
+        ).all()
+        assert active_codes == [code1]
+
+    def test_get_user_code_status_with_active_code(self, db: Session):
         """Test getting status for user with active code."""
-        user_id = uuid.uuid4()
+        user_id = _fresh_uid()
         
         code, expires_at = VerificationCodeService.create_verification_code(
             db=db, user_id=user_id, verification_type=VerificationType.EMAIL_VERIFICATION
@@ -420,18 +448,14 @@ class TestVerificationCodeUtilities:
         
         assert status is not None
         assert status["has_active_code"] is True
-        # Handle timezone differences between SQLite (tests) and PostgreSQL (production)
-        if status["expires_at"].tzinfo is None and expires_at.tzinfo is not None:
-            # SQLite stripped timezone info, compare by replacing timezone
-            assert status["expires_at"] == expires_at.replace(tzinfo=None)
-        else:
-            assert status["expires_at"] == expires_at
+        # SQLite (tests) drops the timezone that PostgreSQL (production) keeps
+        assert _as_naive_utc(status["expires_at"]) == _as_naive_utc(expires_at)
         assert status["attempts_used"] == 0
         assert status["attempts_remaining"] == 3
 
-    def test_get_user_code_status_no_active_code(self, db: Session, mailpit_disabled):
+    def test_get_user_code_status_no_active_code(self, db: Session):
         """Test getting status for user with no active code."""
-        user_id = uuid.uuid4()
+        user_id = _fresh_uid()
         
         status = VerificationCodeService.get_user_code_status(
             db=db, user_id=user_id, verification_type=VerificationType.EMAIL_VERIFICATION
@@ -439,9 +463,9 @@ class TestVerificationCodeUtilities:
         
         assert status is None
 
-    def test_get_user_code_status_after_attempts(self, db: Session, mailpit_disabled):
+    def test_get_user_code_status_after_attempts(self, db: Session):
         """Test getting status after some verification attempts."""
-        user_id = uuid.uuid4()
+        user_id = _fresh_uid()
         
         code, _ = VerificationCodeService.create_verification_code(
             db=db, user_id=user_id, verification_type=VerificationType.EMAIL_VERIFICATION
@@ -464,71 +488,46 @@ class TestVerificationCodeUtilities:
 class TestVerificationCodeSecurity:
     """Test security aspects of the verification code system."""
 
-    def test_different_users_different_codes(self, db: Session, mailpit_disabled):
+    def test_different_users_different_codes(self, two_user_codes):
         """Test that different users get different codes."""
-        user1_id = uuid.uuid4()
-        user2_id = uuid.uuid4()
-        
-        code1, _ = VerificationCodeService.create_verification_code(
-            db=db, user_id=user1_id, verification_type=VerificationType.EMAIL_VERIFICATION
-        )
-        
-        code2, _ = VerificationCodeService.create_verification_code(
-            db=db, user_id=user2_id, verification_type=VerificationType.EMAIL_VERIFICATION
-        )
-        
-        assert code1 != code2
+        assert two_user_codes.user1_id != two_user_codes.user2_id
+        assert two_user_codes.code1 != two_user_codes.code2
 
-    def test_different_types_isolated(self, db: Session, mailpit_disabled):
+    def test_different_types_isolated(self, db: Session, two_type_codes):
         """Test that different verification types are isolated."""
-        user_id = uuid.uuid4()
-        
-        # Create codes for different types
-        email_code, _ = VerificationCodeService.create_verification_code(
-            db=db, user_id=user_id, verification_type=VerificationType.EMAIL_VERIFICATION
-        )
-        
-        reset_code, _ = VerificationCodeService.create_verification_code(
-            db=db, user_id=user_id, verification_type=VerificationType.PASSWORD_RESET
-        )
+        user_id = two_type_codes.user_id
         
         # Email code should not work for password reset
         result = VerificationCodeService.verify_code(
-            db=db, user_id=user_id, code=email_code, verification_type=VerificationType.PASSWORD_RESET
+            db=db, user_id=user_id, code=two_type_codes.email_code, verification_type=VerificationType.PASSWORD_RESET
         )
         assert result["valid"] is False
         
         # Reset code should not work for email verification
         result = VerificationCodeService.verify_code(
-            db=db, user_id=user_id, code=reset_code, verification_type=VerificationType.EMAIL_VERIFICATION
+            db=db, user_id=user_id, code=two_type_codes.reset_code, verification_type=VerificationType.EMAIL_VERIFICATION
         )
         assert result["valid"] is False
 
-    def test_code_entropy_distribution(self):
+    def test_code_entropy_distribution(self, bulk_codes):
         """Test that generated codes have good entropy distribution."""
-        codes = []
-        for _ in range(1000):
-            code = VerificationCodeService.generate_code()
-            codes.append(code)
-        
-        # Test that all digits appear in various positions
-        digit_positions = {}
-        for pos in range(6):
-            digit_positions[pos] = set()
-            for code in codes:
-                digit_positions[pos].add(code[pos])
+        codes = bulk_codes[-1000:]
+        
+        # Transpose the codes into one tuple of digits per position
+        digit_positions = [set(column) for column in zip(*codes)]
         
         # Each position should have multiple different digits
-        for pos in range(6):
-            assert len(digit_positions[pos]) >= 5  # At least 5 different digits per position
+        assert len(digit_positions) == 6
+        for digits in digit_positions:
+            assert len(digits) >= 5  # At least 5 different digits per position
 
 
 class TestNewVerificationTypes:
     """Test newly added verification types for unified security operations."""
 
-    def test_password_change_verification_type(self, db: Session, mailpit_disabled):
+    def test_password_change_verification_type(self, db: Session):
         """Test PASSWORD_CHANGE verification type configuration and behavior."""
-        user_id = uuid.uuid4()
+        user_id = _fresh_uid()
         
         # Create password change verification code
         code, expires_at = VerificationCodeService.create_verification_code(
@@ -557,9 +556,9 @@ class TestNewVerificationTypes:
         assert time_diff < 60  # Within 1 minute tolerance
 
 
-    def test_email_change_verification_type(self, db: Session, mailpit_disabled):
+    def test_email_change_verification_type(self, db: Session):
         """Test EMAIL_CHANGE verification type configuration and behavior."""
-        user_id = uuid.uuid4()
+        user_id = _fresh_uid()
         
         # Create email change verification code
         code, expires_at = VerificationCodeService.create_verification_code(
@@ -587,9 +586,9 @@ class TestNewVerificationTypes:
         time_diff = abs((db_code.expires_at - expected_expiration).total_seconds())
         assert time_diff < 60  # Within 1 minute tolerance
 
-    def test_new_verification_types_isolation(self, db: Session, mailpit_disabled):
+    def test_new_verification_types_isolation(self, db: Session):
         """Test that new verification types are properly isolated from each other."""
-        user_id = uuid.uuid4()
+        user_id = _fresh_uid()
         
         # Create codes for the new verification types
         password_change_code, _ = VerificationCodeService.create_verification_code(
@@ -632,9 +631,9 @@ class TestNewVerificationTypes:
         )
         assert result["valid"] is True
 
-    def test_rate_limiting_applies_to_new_types(self, db: Session, mailpit_disabled):
+    def test_rate_limiting_applies_to_new_types(self, db: Session):
         """Test that rate limiting applies to new verification types."""
-        user_id = uuid.uuid4()
+        user_id = _fresh_uid()
         
         # First PASSWORD_CHANGE request should succeed
         code1, _ = VerificationCodeService.create_verification_code(
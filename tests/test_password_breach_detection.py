@@ -6,6 +6,7 @@ Uses mock responses to avoid hitting the actual API during tests.
 """
 
 import pytest
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, patch, MagicMock
 from fastapi import HTTPException
 import httpx
@@ -17,6 +18,27 @@ from api.password_breach_detection import (
 )
 
 
+# Read-only stand-ins for the security config and HaveIBeenPwned responses;
+# the service only reads these attributes, so plain namespaces replace
+# per-test MagicMocks
+BREACH_DETECTION_ENABLED = SimpleNamespace(
+    password=SimpleNamespace(enable_breach_detection=True)
+)
+BREACH_DETECTION_DISABLED = SimpleNamespace(
+    password=SimpleNamespace(enable_breach_detection=False)
+)
+CLEAN_RESPONSE = SimpleNamespace(
+    text="0018A45C4D1DEF81644B54AB7F969B88D65:1\r\n",
+    raise_for_status=lambda: None,
+)
+# "password" hashes to 5BAA61E4C9B93F3F... so suffix would be 1E4C9B93F3F...
+COMPROMISED_RESPONSE = SimpleNamespace(
+    text="1E4C9B93F3F0682250B6CF8331B7EE68FD8:3730471\r\n",
+    raise_for_status=lambda: None,
+)
+RATE_LIMITED_RESPONSE = SimpleNamespace(status_code=429)
+
+
 class TestPasswordBreachDetectionService:
     """Test the core PasswordBreachDetectionService functionality"""
 
@@ -80,9 +102,7 @@ class TestPasswordBreachDetectionService:
         """Test breach checking when disabled in config"""
         with patch('api.password_breach_detection.get_security_config') as mock_config:
             # Mock config with breach detection disabled
-            mock_password_config = MagicMock()
-            mock_password_config.enable_breach_detection = False
-            mock_config.return_value.password = mock_password_config
+            mock_config.return_value = BREACH_DETECTION_DISABLED
             
             service = PasswordBreachDetectionService()
             is_breached, count = await service.check_password_breach("password123")
@@ -95,18 +115,11 @@ class TestPasswordBreachDetectionService:
         """Test breach checking with clean password"""
         with patch('api.password_breach_detection.get_security_config') as mock_config:
             # Mock config with breach detection enabled
-            mock_password_config = MagicMock()
-            mock_password_config.enable_breach_detection = True
-            mock_config.return_value.password = mock_password_config
-            
-            # Mock HTTP response with clean password (not found)
-            mock_response = MagicMock()
-            mock_response.text = "0018A45C4D1DEF81644B54AB7F969B88D65:1\r\n"
-            mock_response.raise_for_status = MagicMock()
+            mock_config.return_value = BREACH_DETECTION_ENABLED
             
             with patch('httpx.AsyncClient') as mock_client:
                 mock_async_client = AsyncMock()
-                mock_async_client.get.return_value = mock_response
+                mock_async_client.get.return_value = CLEAN_RESPONSE
                 mock_client.return_value.__aenter__.return_value = mock_async_client
                 mock_client.return_value.__aexit__.return_value = None
                 
@@ -121,19 +134,11 @@ class TestPasswordBreachDetectionService:
         """Test breach checking with compromised password"""
         with patch('api.password_breach_detection.get_security_config') as mock_config:
             # Mock config with breach detection enabled
-            mock_password_config = MagicMock()
-            mock_password_config.enable_breach_detection = True
-            mock_config.return_value.password = mock_password_config
-            
-            # Mock HTTP response with compromised password found
-            mock_response = MagicMock()
-            # "password" hashes to 5BAA61E4C9B93F3F... so suffix would be 1E4C9B93F3F...
-            mock_response.text = "1E4C9B93F3F0682250B6CF8331B7EE68FD8:3730471\r\n"
-            mock_response.raise_for_status = MagicMock()
+            mock_config.return_value = BREACH_DETECTION_ENABLED
             
             with patch('httpx.AsyncClient') as mock_client:
                 mock_async_client = AsyncMock()
-                mock_async_client.get.return_value = mock_response
+                mock_async_client.get.return_value = COMPROMISED_RESPONSE
                 mock_client.return_value.__aenter__.return_value = mock_async_client
                 mock_client.return_value.__aexit__.return_value = None
                 
@@ -150,9 +155,7 @@ class TestPasswordBreachDetectionService:
         """Test graceful degradation when API times out"""
         with patch('api.password_breach_detection.get_security_config') as mock_config:
             # Mock config with breach detection enabled
-            mock_password_config = MagicMock()
-            mock_password_config.enable_breach_detection = True
-            mock_config.return_value.password = mock_password_config
+            mock_config.return_value = BREACH_DETECTION_ENABLED
             
             with patch('httpx.AsyncClient') as mock_client:
                 mock_async_client = AsyncMock()
@@ -173,18 +176,12 @@ class TestPasswordBreachDetectionService:
         """Test graceful degradation when API returns 429 rate limit"""
         with patch('api.password_breach_detection.get_security_config') as mock_config:
             # Mock config with breach detection enabled
-            mock_password_config = MagicMock()
-            mock_password_config.enable_breach_detection = True
-            mock_config.return_value.password = mock_password_config
-            
-            # Mock HTTP 429 response
-            mock_response = MagicMock()
-            mock_response.status_code = 429
+            mock_config.return_value = BREACH_DETECTION_ENABLED
             
             with patch('httpx.AsyncClient') as mock_client:
                 mock_async_client = AsyncMock()
                 mock_async_client.get.side_effect = httpx.HTTPStatusError(
-                    "Rate limit exceeded", request=MagicMock(), response=mock_response
+                    "Rate limit exceeded", request=MagicMock(), response=RATE_LIMITED_RESPONSE
                 )
                 mock_client.return_value.__aenter__.return_value = mock_async_client
                 mock_client.return_value.__aexit__.return_value = None
@@ -207,7 +204,9 @@ class TestConvenienceFunctions:
             # Mock no running loop (RuntimeError)
             mock_get_loop.side_effect = RuntimeError("No running loop")
             
-            with patch('api.password_breach_detection.asyncio.run') as mock_run:
+            # Close the coroutine instead of running it so it is never left
+            # un-awaited for the garbage collector to warn about later
+            with patch('api.password_breach_detection.asyncio.run', side_effect=lambda coro: coro.close()) as mock_run:
                 with patch('api.password_breach_detection.check_password_breach_async') as mock_async:
                     mock_async.return_value = None
                     